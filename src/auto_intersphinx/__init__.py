@@ -12,17 +12,26 @@ to cross-reference.
 
 from __future__ import annotations  # not required for Python >= 3.10
 
+import concurrent.futures
+import copy
+import functools
+import hashlib
 import importlib.metadata
 import inspect
 import pathlib
 import textwrap
 import typing
+import urllib.parse
+
+import packaging.utils
 
-from sphinx.application import Sphinx
-from sphinx.config import Config
 from sphinx.util import logging
 
-from .catalog import BUILTIN_CATALOG, Catalog, LookupCatalog
+if typing.TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.config import Config
+
+    from .catalog import Catalog, LookupCatalog
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +55,12 @@ def oneliner(s: str) -> str:
     return inspect.cleandoc(s).replace("\n", " ")
 
 
+_WRAPPER = textwrap.TextWrapper(
+    width=80, break_long_words=False, break_on_hyphens=False
+)
+"""Text wrapper used by :py:func:`rewrap`, built only once."""
+
+
 def rewrap(s: str) -> str:
     """Re-wrap a multiline docstring into a 80-character format.
 
@@ -62,7 +77,82 @@ def rewrap(s: str) -> str:
 
         An 80-column wrapped multiline string
     """
-    return "\n".join(textwrap.wrap(oneliner(s), width=80))
+    return "\n".join(_WRAPPER.wrap(oneliner(s)))
+
+
+# Constant text of log messages, formatted with package-specific information
+# (and wrapped) when required.
+_MSG_MAPPING_CONFLICT = oneliner(
+    """
+    Ignoring reset of `{name}' intersphinx_mapping, because it
+    currently already points to `{curr}', and that is different
+    from the new value `{newval}'
+    """
+)
+
+_MSG_NOT_IN_USER_CATALOG = oneliner(
+    """
+    Package {p} is available in user catalog, however version
+    {v} is not.  You may want to fix or update the catalog?
+    """
+)
+
+_MSG_NOT_IN_BUILTIN_CATALOG = oneliner(
+    """
+    Package {p} is available in builtin catalog, however
+    version {v} is not.  You may want to fix or update that
+    catalog?
+    """
+)
+
+_MSG_NOT_IN_ENVIRONMENT = oneliner(
+    """
+    Package {p} is not available at your currently installed
+    environment. If the name of the installed package differs
+    from that you specified, you may tweak your catalog using
+    ['{p}']['sources']['environment'] = <NAME> so that the
+    package can be properly found.
+    """
+)
+
+_MSG_NOT_IN_RTD = oneliner(
+    """
+    Package {p} is not available at readthedocs.org. If the
+    name of the installed package differs from that you
+    specify, you may patch your catalog using
+    ['{p}']['sources']['environment'] = <NAME> so that the
+    package can be properly found.
+    """
+)
+
+_MSG_NOT_IN_PYPI = oneliner(
+    """
+    Package {p} is not available at your currently installed
+    environment. If the name of the installed package differs
+    from that you specify, you may patch your catalog using
+    ['{p}']['sources']['environment'] = <NAME> so that the
+    package can be properly found.
+    """
+)
+
+_MSG_NOT_FOUND = oneliner(
+    """
+    Cannot find suitable catalog entry for `{name}'.  I searched
+    both internally and online without access.  To remedy this,
+    provide the links on your own catalog, be less selective with
+    the version to bind documentation to, or simply remove this
+    entry from the auto-intersphinx package list.  May be this
+    package has no Sphinx documentation at all?
+    """
+)
+
+
+def _inventory_url(addr: str, objects_inv: str | None) -> str:
+    """Returns the URL of the inventory for a given intersphinx mapping
+    entry."""
+    if not addr.endswith("/"):
+        addr += "/"
+    return urllib.parse.urljoin(addr, objects_inv or "objects.inv")
 
 
 def _add_index(
@@ -88,35 +178,187 @@ def _add_index(
             the remote address (if different than ``objects.inv``.)
     """
 
-    if name not in mapping:
+    existing = mapping.get(name)
+
+    if existing is None:
         mapping[name] = (addr, objects_inv)
 
-    elif (
-        mapping[name][0].rstrip("/") == addr.rstrip("/")
-        and mapping[name][1] == objects_inv
+    elif existing == (addr, objects_inv) or (
+        existing[1] == objects_inv and existing[0].rstrip("/") == addr.rstrip("/")
     ):
         logger.info(f"Ignoring repeated setting of `{name}' intersphinx_mapping")
 
     else:
-        curr = mapping[name][0]
-        curr += "/" if not curr.endswith("/") else ""
-        curr += mapping[name][1] if mapping[name][1] else "objects.inv"
-
-        newval = addr
-        newval += "/" if not newval.endswith("/") else ""
-        newval += objects_inv if objects_inv else "objects.inv"
-
+        curr = _inventory_url(*existing)
+        newval = _inventory_url(addr, objects_inv)
         logger.error(
-            rewrap(
-                f"""
-                Ignoring reset of `{name}' intersphinx_mapping, because it
-                currently already points to `{curr}', and that is different
-                from the new value `{newval}'
-                """
-            )
+            rewrap(_MSG_MAPPING_CONFLICT.format(name=name, curr=curr, newval=newval))
         )
 
 
+def _flush(logs: list[tuple[str, str]]) -> None:
+    """Emits log messages buffered by :py:func:`_resolve_one`, in order."""
+    for level, message in logs:
+        getattr(logger, level)(message)
+
+
+def _resolve_one(
+    catalog: Catalog,
+    p: str,
+    p_norm: str,
+    v: str | None,
+    env_index: dict[str, importlib.metadata.Distribution],
+) -> tuple[str | None, list[tuple[str, str]]]:
+    """Looks up documentation URLs for a single package online.
+
+    This function probes the current Python environment, readthedocs.org and
+    pypi.org, in this order, stopping at the first match.  It is executed
+    concurrently for all packages that could not be resolved through the user
+    or built-in catalogs, and therefore does not emit log messages directly,
+    but rather returns them, so the caller can flush them in the order packages
+    were listed.
+
+
+    Arguments:
+
+        catalog: A catalog that is private to this call, and will be updated
+            with whatever information is found online.  The caller is
+            responsible for merging it back into the user catalog.
+
+        p: Name of the package to look up
+
+        p_norm: Canonical (PEP 503) name of the package to look up
+
+        v: Version of the package to look up
+
+        env_index: Index of distributions installed on the current Python
+            environment, as returned by
+            :py:func:`.catalog.environment_index`.
+
+
+    Returns:
+
+        A tuple containing the documentation URL found (or ``None``, if no
+        suitable URL was found), and a list of ``(level, message)`` tuples to
+        be logged.
+    """
+    from .catalog import LookupCatalog
+
+    logs: list[tuple[str, str]] = []
+    lookup = LookupCatalog(catalog)
+
+    # sources to probe, in order of priority: each updates the catalog with
+    # whatever is found about the package.  Even if a source knows the
+    # package, but not the requested version, the next ones are probed, as
+    # they may list other versions (e.g. pypi.org lists the latest release).
+    providers: list[tuple[typing.Callable[[], bool], str]] = [
+        (
+            functools.partial(
+                catalog.update_versions_from_environment,
+                p,
+                None,
+                env_index=env_index,
+            ),
+            _MSG_NOT_IN_ENVIRONMENT,
+        ),
+        (
+            functools.partial(
+                catalog.update_versions_from_rtd,
+                p,
+                None,
+                cached=True,
+            ),
+            _MSG_NOT_IN_RTD,
+        ),
+        (
+            functools.partial(
+                catalog.update_versions_from_pypi,
+                p,
+                None,
+                max_entries=0,
+                cached=True,
+            ),
+            _MSG_NOT_IN_PYPI,
+        ),
+    ]
+
+    for update, not_found in providers:
+        update()
+        lookup.invalidate(p)
+        addr = lookup.get_normalized(p_norm, v)
+        if addr is not None:
+            return addr, logs
+        logs.append(("info", rewrap(not_found.format(p=p))))
+
+    return None, logs
+
+
+def _resolve_catalog_path(app: Sphinx, config: Config) -> pathlib.Path | None:
+    """Returns the path to the user catalog, if one is configured.
+
+    Relative paths are resolved with respect to the Sphinx configuration
+    directory.
+
+
+    Arguments:
+
+        app: Sphinx application
+
+        config: Sphinx configuration
+
+
+    Returns:
+
+        The path to the user catalog, or ``None``, if no user catalog is set
+        on the configuration parameter ``auto_intersphinx_catalog``.
+    """
+    if not config.auto_intersphinx_catalog:
+        return None
+
+    retval = pathlib.Path(config.auto_intersphinx_catalog)
+    if not retval.is_absolute():
+        retval = pathlib.Path(app.confdir) / retval
+    return retval
+
+
+@functools.lru_cache(maxsize=1)
+def _builtin_lookup_cached(mtime: int | None) -> LookupCatalog:
+    """Loads the built-in catalog, returning a lookup catalog for it.
+
+    Results are kept across calls to :py:func:`populate_intersphinx_mapping`,
+    so that the built-in catalog is only parsed once when several projects are
+    built by the same Python process.  The built-in catalog is never modified
+    by this extension.
+
+
+    Arguments:
+
+        mtime: Modification time of the built-in catalog, in nanoseconds, used
+            as cache key, so the catalog is re-loaded if it changes.  It is
+            ``None`` if the catalog is not a file (e.g. if this package is
+            installed as a zip file).
+
+
+    Returns:
+
+        A lookup catalog for the built-in catalog.
+    """
+    from .catalog import BUILTIN_CATALOG, Catalog, LookupCatalog
+
+    builtin_catalog = Catalog()
+    builtin_catalog.load(BUILTIN_CATALOG)
+    return LookupCatalog(builtin_catalog)
+
+
+def _builtin_lookup() -> LookupCatalog:
+    """Returns a lookup catalog for the built-in catalog, loading it only if it
+    was not loaded before, or if it changed since."""
+    from .catalog import BUILTIN_CATALOG
+
+    stat = getattr(BUILTIN_CATALOG, "stat", None)
+    return _builtin_lookup_cached(stat().st_mtime_ns if stat else None)
+
+
 def populate_intersphinx_mapping(app: Sphinx, config: Config) -> None:
     """Main extension method.
 
@@ -137,6 +379,13 @@ def populate_intersphinx_mapping(app: Sphinx, config: Config) -> None:
     4. https://readthedocs.org
     5. https://pypi.org
 
+    Online lookups (steps 3 to 5) are executed concurrently for all packages
+    that cannot be resolved through the catalogs.  Results are merged into the
+    user catalog, and reported, in the order packages are listed.  Results
+    from readthedocs.org and pypi.org are also kept in a persistent cache
+    (under ``~/.cache/auto_intersphinx``), so that subsequent builds do not
+    need to reach those services again.
+
 
     Arguments:
 
@@ -144,119 +393,96 @@ def populate_intersphinx_mapping(app: Sphinx, config: Config) -> None:
 
         config: Sphinx configuration
     """
+    from .catalog import Catalog, LookupCatalog, environment_index, max_lookup_workers
+
     m = config.intersphinx_mapping
 
-    builtin_catalog = Catalog()
-    builtin_catalog.loads(BUILTIN_CATALOG.read_text())
-    builtin_lookup = LookupCatalog(builtin_catalog)
+    @functools.cache
+    def _get_builtin_lookup() -> LookupCatalog:
+        """Loads the built-in catalog, only once, and only if required."""
+        return _builtin_lookup()
 
     user_catalog = Catalog()
+    user_catalog_mtime: int | None = None
 
-    if config.auto_intersphinx_catalog:
-        user_catalog_file = pathlib.Path(config.auto_intersphinx_catalog)
-        if not user_catalog_file.is_absolute():
-            user_catalog_file = (
-                pathlib.Path(app.confdir) / config.auto_intersphinx_catalog
-            )
-        if user_catalog_file.exists():
-            user_catalog.loads(user_catalog_file.read_text())
+    user_catalog_file = _resolve_catalog_path(app, config)
+    if user_catalog_file is not None and user_catalog_file.exists():
+        user_catalog_mtime = user_catalog_file.stat().st_mtime_ns
+        user_catalog.load(user_catalog_file)
     user_lookup = LookupCatalog(user_catalog)
 
+    # catalogs to search, in order of priority, with the level and message to
+    # log if the package is listed, but not the requested version.  The user
+    # receiving the message has access to their own catalog: warn because it
+    # may trigger a voluntary update action.  The user may not have access to
+    # the built-in catalog: downgrade message importance to INFO.
+    catalog_providers: list[tuple[typing.Callable[[], LookupCatalog], str, str]] = [
+        (lambda: user_lookup, "warning", _MSG_NOT_IN_USER_CATALOG),
+        (_get_builtin_lookup, "info", _MSG_NOT_IN_BUILTIN_CATALOG),
+    ]
+
+    # first, go through the catalogs, which is cheap, and record what needs to
+    # be looked up online
+    packages: list[tuple[str, str, str | None, str | None, list[tuple[str, str]]]] = []
     for k in config.auto_intersphinx_packages:
         p, v = k if isinstance(k, (tuple, list)) else (k, "stable")
-
-        addr = user_lookup.get(p, v)
-        if addr is not None:
-            _add_index(m, p, addr, None)
-            continue  # got an URL, continue to next package
-        elif p in user_catalog:
-            # The user receiving the message has access to their own catalog.
-            # Warn because it may trigger a voluntary update action.
-            logger.warning(
-                rewrap(
-                    f"""
-                    Package {p} is available in user catalog, however version
-                    {v} is not.  You may want to fix or update the catalog?
-                    """
+        # canonicalize the name only once, for all lookups that follow
+        p_norm: str = packaging.utils.canonicalize_name(p)
+        logs: list[tuple[str, str]] = []
+
+        addr = None
+        for get_lookup, level, not_found in catalog_providers:
+            lookup = get_lookup()
+            addr = lookup.get_normalized(p_norm, v)
+            if addr is not None:
+                break
+            if p_norm in lookup:
+                logs.append((level, rewrap(not_found.format(p=p, v=v))))
+
+        packages.append((p, p_norm, v, addr, logs))
+
+    # next, concurrently look up online whatever could not be found on the
+    # catalogs - lookups are I/O bound, so threads work well here
+    pending = {(p, p_norm, v) for p, p_norm, v, addr, _ in packages if addr is None}
+    futures: dict[tuple[str, str | None], concurrent.futures.Future] = {}
+    diffs: dict[tuple[str, str | None], Catalog] = {}
+    if pending:
+        # snapshot installed distributions only once for all lookups
+        env_index = environment_index()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_lookup_workers(0), len(pending))
+        ) as executor:
+            for p, p_norm, v in pending:
+                # each lookup works on its own copy of the package entry, so
+                # that the user catalog is only ever modified by this thread
+                diffs[(p, v)] = Catalog()
+                if p in user_catalog:
+                    diffs[(p, v)][p] = copy.deepcopy(user_catalog[p])
+                futures[(p, v)] = executor.submit(
+                    _resolve_one, diffs[(p, v)], p, p_norm, v, env_index
                 )
-            )
-
-        addr = builtin_lookup.get(p, v)
-        if addr is not None:
-            _add_index(m, p, addr, None)
-            continue  # got an URL, continue to next package
-        elif p in builtin_catalog:
-            # The user receiving the message may not have access to the
-            # built-in catalog.  Downgrade message importance to INFO
-            logger.info(
-                rewrap(
-                    f"""
-                    Package {p} is available in builtin catalog, however
-                    version {v} is not.  You may want to fix or update that
-                    catalog?
-                    """
-                )
-            )
-
-        # try to see if the package is installed using the user catalog
-        user_catalog.update_versions_from_environment(p, None)
-        user_lookup.reset()
-        addr = user_lookup.get(p, v)
-        if addr is not None:
-            _add_index(m, p, addr, None)
-            continue  # got an URL, continue to next package
-        else:
-            logger.info(
-                rewrap(
-                    f"""
-                    Package {p} is not available at your currently installed
-                    environment. If the name of the installed package differs
-                    from that you specified, you may tweak your catalog using
-                    ['{p}']['sources']['environment'] = <NAME> so that the
-                    package can be properly found.
-                    """
-                )
-            )
 
-        # try to see if the package is available on readthedocs.org
-        user_catalog.update_versions_from_rtd(p, None)
-        user_lookup.reset()
-        addr = user_lookup.get(p, v)
-        if addr is not None:
-            _add_index(m, p, addr, None)
-            continue  # got an URL, continue to next package
+    # finally, report and apply results in the order packages were listed
+    done: set[tuple[str, str | None]] = set()
+    for p, p_norm, v, addr, logs in packages:
+        if (p, v) in done:
+            # repeated entry resolved online: the user catalog already
+            # contains the results, so just re-use them
+            addr = user_lookup.get_normalized(p_norm, v)
         else:
-            logger.info(
-                rewrap(
-                    f"""
-                    Package {p} is not available at readthedocs.org. If the
-                    name of the installed package differs from that you
-                    specify, you may patch your catalog using
-                    ['{p}']['sources']['environment'] = <NAME> so that the
-                    package can be properly found.
-                    """
-                )
-            )
+            _flush(logs)
+            if addr is None:
+                addr, logs = futures[(p, v)].result()
+                _flush(logs)
+                # merges (instead of replacing) package entries, as the same
+                # package may have been looked up for another version
+                user_catalog.merge(diffs[(p, v)])
+                user_lookup.invalidate(p)
+                done.add((p, v))
 
-        # try to see if the package is available on readthedocs.org
-        user_catalog.update_versions_from_pypi(p, None, max_entries=0)
-        user_lookup.reset()
-        addr = user_lookup.get(p, v)
         if addr is not None:
             _add_index(m, p, addr, None)
             continue  # got an URL, continue to next package
-        else:
-            logger.info(
-                rewrap(
-                    f"""
-                    Package {p} is not available at your currently installed
-                    environment. If the name of the installed package differs
-                    from that you specify, you may patch your catalog using
-                    ['{p}']['sources']['environment'] = <NAME> so that the
-                    package can be properly found.
-                    """
-                )
-            )
 
         # if you get to this point, then the package name was not
         # resolved - emit an error and continue
@@ -265,32 +491,22 @@ def populate_intersphinx_mapping(app: Sphinx, config: Config) -> None:
         else:
             name = p
 
-        logger.error(
-            rewrap(
-                f"""
-                Cannot find suitable catalog entry for `{name}'.  I searched
-                both internally and online without access.  To remedy this,
-                provide the links on your own catalog, be less selective with
-                the version to bind documentation to, or simply remove this
-                entry from the auto-intersphinx package list.  May be this
-                package has no Sphinx documentation at all?
-                """
-            )
-        )
+        logger.error(rewrap(_MSG_NOT_FOUND.format(name=name)))
 
     # by the end of the processing, save the user catalog file if a path was
     # given, so that the user does not have to do this again on the next
     # rebuild, making it work like a cache.
-    if config.auto_intersphinx_catalog and user_catalog:
-        user_catalog_file = pathlib.Path(config.auto_intersphinx_catalog)
-        if not user_catalog_file.is_absolute():
-            user_catalog_file = (
-                pathlib.Path(app.confdir) / config.auto_intersphinx_catalog
-            )
-        current_contents: str = ""
-        if user_catalog_file.exists():
-            current_contents = user_catalog_file.read_text()
-        if current_contents != user_catalog.dumps():
+    if user_catalog_file is not None and user_catalog:
+        changed = user_catalog.dirty
+        if not changed:
+            # the file may have been modified (or removed) by another process
+            # in the meanwhile: in this case, compare contents
+            if not user_catalog_file.exists():
+                changed = True
+            elif user_catalog_file.stat().st_mtime_ns != user_catalog_mtime:
+                on_disk = hashlib.blake2b(user_catalog_file.read_bytes())
+                changed = on_disk.digest() != user_catalog.content_hash()
+        if changed:
             logger.info(
                 f"Recording {len(user_catalog)} entries to {str(user_catalog_file)}..."
             )
@@ -0,0 +1,252 @@
+# SPDX-FileCopyrightText: Copyright © 2022 Idiap Research Institute <contact@idiap.ch>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+"""Persistent cache for online documentation lookups.
+
+Results of online lookups (e.g. on readthedocs.org or pypi.org) are stored as
+small JSON files under the user cache directory, one per ``(source, package)``
+pair.  Fresh entries are served directly.  Stale entries are also served, but
+trigger a refresh on a background thread.  If the refresh fails, the stale
+entry is kept, so that builds still work offline.  Empty results are not
+stored, as they may be caused by network errors.
+
+Results parsed from HTTP responses that carry validators (``ETag`` or
+``Last-Modified`` headers) are also stored, so that they can be re-validated
+with conditional requests, which do not transfer the response body again if it
+did not change.  Only the parsed results (not the raw responses) are stored.
+"""
+
+from __future__ import annotations  # not required for Python >= 3.10
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import time
+import typing
+
+import requests
+
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _ttl() -> float:
+    """Returns the time to live of cache entries, in seconds.
+
+    This is one day, unless the environment variable
+    ``AUTO_INTERSPHINX_CACHE_TTL`` is set to another number of seconds.
+    """
+    try:
+        return float(os.environ["AUTO_INTERSPHINX_CACHE_TTL"])
+    except (KeyError, ValueError):
+        return 86400.0
+
+
+TTL: float = _ttl()
+"""Time (in seconds) after which a cached entry is considered stale."""
+
+
+def cache_dir() -> pathlib.Path:
+    """Returns the directory where lookup results are cached.
+
+    This is ``$XDG_CACHE_HOME/auto_intersphinx`` if the environment variable
+    ``XDG_CACHE_HOME`` is set, or ``~/.cache/auto_intersphinx`` otherwise.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / __package__
+
+
+def _path(source: str, name: str) -> pathlib.Path:
+    """Returns the path of the cache file for a given source and package."""
+    key = hashlib.sha1(f"{source}:{name}".encode()).hexdigest()
+    return cache_dir() / f"{key}.json"
+
+
+def _read(path: pathlib.Path) -> dict[str, typing.Any] | None:
+    """Reads a cache entry, returns ``None`` if not available or corrupt."""
+    try:
+        with path.open("rt") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: pathlib.Path, value: dict[str, typing.Any]) -> None:
+    """Atomically (re-)writes a cache entry."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("wt") as f:
+            json.dump({"timestamp": time.time(), "value": value}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.debug(f"Cannot write cache entry at `{str(path)}': {e}")
+
+
+def _refresh(
+    path: pathlib.Path,
+    fetch: typing.Callable[[], dict[str, str]],
+    stale: dict[str, str] | None,
+) -> dict[str, str]:
+    """Fetches a new value and caches it, keeping stale values on errors."""
+    try:
+        value = fetch()
+    except requests.exceptions.RequestException:
+        if stale is None:
+            raise
+        logger.debug(f"Keeping stale cache entry at `{str(path)}'")
+        return stale
+
+    if not value:
+        # lookup functions hide network errors, returning empty results, which
+        # are therefore never cached: the lookup is retried next time.  Keep
+        # the stale (non-empty) entry, if any, instead of discarding it.
+        if stale:
+            logger.debug(f"Keeping stale cache entry at `{str(path)}'")
+            return stale
+        return value
+
+    _write(path, value)
+    return value
+
+
+def lookup(
+    source: str, name: str, fetch: typing.Callable[[], dict[str, str]]
+) -> dict[str, str]:
+    """Returns the (cached) result of an online lookup.
+
+    Arguments:
+
+        source: Name of the source being looked up (e.g. ``readthedocs`` or
+            ``pypi``).
+
+        name: Name of the package being looked up at ``source``.
+
+        fetch: A callable without arguments that executes the actual (online)
+            lookup, returning a dictionary mapping versions to URLs.
+
+
+    Returns:
+
+        A dictionary mapping versions to URLs, either from the cache, or from
+        calling ``fetch``.
+    """
+    path = _path(source, name)
+    entry = _read(path)
+
+    if entry is None:
+        return _refresh(path, fetch, None)
+
+    if (time.time() - entry["timestamp"]) >= TTL:
+        # stale-while-revalidate: serve the stale entry, refresh in background
+        logger.debug(f"Refreshing stale cache entry for {source}:{name}...")
+        threading.Thread(
+            target=_refresh, args=(path, fetch, entry["value"]), daemon=True
+        ).start()
+
+    return entry["value"]
+
+
+def age(source: str, name: str) -> float | None:
+    """Returns the age of a cache entry, in seconds.
+
+    Arguments:
+
+        source: Name of the source the entry refers to.
+
+        name: Name of the package the entry refers to.
+
+
+    Returns:
+
+        The time elapsed since the entry was last written, or ``None``, if the
+        entry is not available.
+    """
+    entry = _read(_path(source, name))
+    if entry is None:
+        return None
+    return time.time() - entry["timestamp"]
+
+
+def touch(source: str, name: str) -> None:
+    """(Re-)writes an empty cache entry, to record when ``name`` was last
+    checked at ``source``."""
+    _write(_path(source, name), {})
+
+
+_T = typing.TypeVar("_T")
+
+
+def conditional_get(
+    session: requests.Session,
+    url: str,
+    timeout: tuple[float, float],
+    parse: typing.Callable[[bytes], _T],
+) -> _T | None:
+    """Fetches and parses the contents of an URL, re-validating cached
+    responses.
+
+    If a response for ``url`` was cached before, the request is sent with
+    ``If-None-Match`` and ``If-Modified-Since`` headers.  If the server
+    replies with ``304 Not Modified``, the cached result is returned without
+    downloading the contents again.  Successful responses are cached if the
+    server provides ``ETag`` or ``Last-Modified`` headers.  Only the parsed
+    result is cached, so that ``parse`` may keep cache entries small by
+    dropping what is not needed from (possibly large) responses.
+
+
+    Arguments:
+
+        session: The HTTP session to use for the request.
+
+        url: The URL to fetch.
+
+        timeout: Timeouts (connection, read), in seconds, for the request.
+
+        parse: A callable that converts the (raw) contents of the URL into a
+            JSON-serializable result.
+
+
+    Returns:
+
+        The parsed contents of the URL, or ``None``, if the server replied
+        with an error.
+
+
+    Raises:
+
+        requests.exceptions.RequestException: if the request fails.
+    """
+    path = _path("http", url)
+    entry = _read(path)
+
+    headers = {}
+    if entry is not None:
+        if entry["value"].get("etag"):
+            headers["If-None-Match"] = entry["value"]["etag"]
+        if entry["value"].get("last_modified"):
+            headers["If-Modified-Since"] = entry["value"]["last_modified"]
+
+    r = session.get(url, headers=headers, timeout=timeout)
+
+    if r.status_code == 304 and entry is not None:
+        logger.debug(f"Contents of `{url}' did not change, using cache")
+        return entry["value"]["parsed"]
+
+    if not r.ok:
+        return None
+
+    parsed = parse(r.content)
+
+    etag = r.headers.get("ETag", "")
+    last_modified = r.headers.get("Last-Modified", "")
+    if etag or last_modified:
+        _write(
+            path,
+            {"etag": etag, "last_modified": last_modified, "parsed": parsed},
+        )
+
+    return parsed
@@ -6,6 +6,11 @@
 from __future__ import annotations  # not required for Python >= 3.10
 
 import collections.abc
+import concurrent.futures
+import copy
+import functools
+import hashlib
+import importlib.abc
 import importlib.metadata
 import importlib.resources
 import json
@@ -13,13 +18,24 @@ import pathlib
 import re
 import shutil
 import typing
+import urllib.parse
 
 import lxml.html
+import packaging.utils
 import packaging.version
 import requests
+import requests.adapters
+import urllib3.util.retry
 
 from sphinx.util import logging
 
+from . import _cache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,23 +43,179 @@ PackageDictionaryType = dict[str, dict[str, str]]
 """Type for the internal values of :py:class:`Catalog`"""
 
 
+def _user_agent() -> str:
+    """Returns the User-Agent header to use when reaching out to websites."""
+    try:
+        version = importlib.metadata.version("auto-intersphinx")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"auto-intersphinx/{version} {requests.utils.default_user_agent()}"
+
+
+_POOL_SIZE = 32
+"""Maximum number of connections kept open to each host by the HTTP session."""
+
+
+def _make_session() -> requests.Session:
+    """Creates an HTTP session with connection pooling and retries."""
+    session = requests.Session()
+    session.headers["User-Agent"] = _user_agent()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=_POOL_SIZE,
+        pool_maxsize=_POOL_SIZE,
+        # after retries, return the last response instead of raising, so that
+        # callers can just check whether it is ok
+        max_retries=urllib3.util.retry.Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+"""HTTP session shared by all online lookups, so connections are re-used."""
+
+
+_TIMEOUT = (3, 10)
+"""Timeouts (connection, read), in seconds, for all online lookups."""
+
+
+_MAX_WORKERS = 16
+"""Maximum number of concurrent online lookups for a single package."""
+
+
+def max_lookup_workers(pypi_max_entries: int) -> int:
+    """Returns how many packages may be looked up concurrently.
+
+    Each PyPI lookup probes up to ``pypi_max_entries`` releases concurrently
+    (see :py:func:`docurls_from_pypi`).  The number of packages looked up
+    concurrently is reduced accordingly, so that all connections fit in the
+    pool of the shared HTTP session.
+    """
+    if pypi_max_entries < 0:
+        per_package = _MAX_WORKERS
+    else:
+        per_package = min(_MAX_WORKERS, max(1, pypi_max_entries))
+    return max(1, min(_MAX_WORKERS, _POOL_SIZE // per_package))
+
+
+def fetch_lines(url: str) -> typing.Iterator[str]:
+    """Yields the lines of a remote text file, as they are downloaded.
+
+    The file is retrieved with the HTTP session shared by all online lookups.
+
+
+    Arguments:
+
+        url: The address of the file to retrieve.
+
+
+    Returns:
+
+        An iterator over the (decoded) lines of the file.
+
+
+    Raises:
+
+        requests.exceptions.RequestException: if the file cannot be retrieved.
+    """
+    with _SESSION.get(url, stream=True, timeout=_TIMEOUT) as r:
+        r.raise_for_status()
+        encoding = r.encoding or "utf-8"
+        for k in r.iter_lines():
+            yield k.decode(encoding)
+
+
+def _head(
+    http: requests.Session, url: str, **kwargs: typing.Any
+) -> requests.Response | None:
+    """Sends a HEAD request, returns ``None`` if it fails.
+
+    Failures (e.g. timeouts or unreachable hosts) are logged, so that a
+    single misbehaving documentation site does not abort other lookups.
+    """
+    try:
+        return http.head(url, timeout=_TIMEOUT, **kwargs)
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Cannot reach `{url}': {e}")
+        return None
+
+
+def _has_inventory(http: requests.Session, addr: str) -> bool:
+    """Checks if an ``objects.inv`` file is available at a documentation
+    address."""
+    r = _head(http, addr + "objects.inv")
+    return r is not None and r.ok
+
+
 BUILTIN_CATALOG = importlib.resources.files(__package__).joinpath("catalog.json")
 """Base name for the catalog file distributed with this package."""
 
 
-PEP440_RE = re.compile(
-    r"^\s*" + packaging.version.VERSION_PATTERN + r"\s*$",
-    re.VERBOSE | re.IGNORECASE,
-)
-"""Regular expression for matching PEP-440 version numbers."""
+def _json_loads(contents: str | bytes) -> typing.Any:
+    """Parses JSON contents, using :py:mod:`orjson` if installed."""
+    if orjson is not None:
+        return orjson.loads(contents)
+    return json.loads(contents)
+
+
+def _json_dumps(data: typing.Any, newline: bool = False) -> bytes:
+    """Serializes data as JSON with a 2-space indentation, using
+    :py:mod:`orjson` if installed.
+
+    If ``newline`` is set, a final newline is appended to the output by the
+    serializer itself, avoiding a copy of the (possibly large) result.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(data, option=option)
+    # same output as orjson: non-ASCII characters are not escaped
+    return (
+        json.dumps(data, indent=2, ensure_ascii=False) + ("\n" if newline else "")
+    ).encode()
+
+
+def dumps(data: typing.Any) -> str:
+    """Serializes data as JSON, with the same formatting as catalog files."""
+    return _json_dumps(data).decode()
+
+
+_looks_like_version = re.compile(r"\s*[vV]?[0-9]").match
+"""Cheap pre-filter for strings that may be PEP-440 version numbers."""
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_version(v: str) -> packaging.version.Version | None:
+    """Parses a PEP-440 version number, returns ``None`` if invalid.
+
+    Parsed versions are immutable, so results are cached: the same
+    version strings are parsed over and over while catalogs are updated
+    and indexed.
+    """
+    try:
+        return packaging.version.Version(v)
+    except packaging.version.InvalidVersion:
+        return None
+
+
+@functools.lru_cache(maxsize=2048)
 def _ensure_webdir(addr: str) -> str:
     """Ensures the web-address ends in a /, and contains ``objects.inv``"""
-    if addr.endswith(".html"):
-        addr = addr[: addr.rfind("/")]
-    if not addr.endswith("/"):
-        addr += "/"
+    parts = urllib.parse.urlsplit(addr)
+    path = parts.path
+    if path.endswith(".html"):
+        path = path[: path.rfind("/")]
+    if not path.endswith("/"):
+        path += "/"
+    # queries and fragments do not make sense on a directory address
+    addr = urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, "", ""))
 
     # objects = addr + "/" + "objects.inv"
     # if requests.head(objects).ok:
@@ -53,33 +225,62 @@ def _ensure_webdir(addr: str) -> str:
     return addr
 
 
+def _normalize_urls(versions: dict[str, str]) -> list[tuple[str, str]]:
+    """Returns versions and URLs, in order, ignoring trailing slashes."""
+    return [(k, v.rstrip("/")) for k, v in versions.items()]
+
+
 def _reorder_versions(vdict: dict[str, str]) -> dict[str, str]:
     """Re-orders version dictionary by decreasing version."""
     # nota bene: new dicts preserve insertion order
-    retval: dict[str, str] = {}
 
     # these keys come always first, if available
     protected = ("latest", "main", "master", "stable")
-    for key in protected:
-        if key in vdict:
-            retval[key] = vdict[key]
+    retval: dict[str, str] = {k: vdict[k] for k in protected if k in vdict}
 
     # next, are releases in reverse order
-    version_map = {
-        packaging.version.Version(k): k
-        for k in vdict.keys()
-        if (k not in protected) and PEP440_RE.match(k)
-    }
-    for version in sorted(version_map.keys(), reverse=True):
-        retval[version_map[version]] = vdict[version_map[version]]
+    version_map: dict[packaging.version.Version, str] = {}
+    for k in vdict:
+        if k not in retval and (version := _parse_version(k)) is not None:
+            version_map[version] = k
+    for _, k in sorted(version_map.items(), reverse=True):
+        retval[k] = vdict[k]
 
     # now, everything else
-    retval.update({k: v for k, v in vdict.items() if k not in retval})
+    if len(retval) != len(vdict):
+        retval.update({k: v for k, v in vdict.items() if k not in retval})
 
     return retval
 
 
-def docurls_from_environment(package: str) -> dict[str, str]:
+def environment_index() -> dict[str, importlib.metadata.Distribution]:
+    """Indexes all distributions installed on the current Python environment.
+
+    Building this index walks ``sys.path`` only once.  It can then be passed to
+    :py:func:`docurls_from_environment` to avoid walking ``sys.path`` again for
+    every package looked up.
+
+
+    Returns:
+
+        A dictionary mapping canonical (PEP 503) distribution names to
+        distribution objects.  If the same distribution is installed more than
+        once, the first one found on ``sys.path`` is kept, as
+        :py:func:`importlib.metadata.distribution` would do.
+    """
+    retval: dict[str, importlib.metadata.Distribution] = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            retval.setdefault(packaging.utils.canonicalize_name(name), dist)
+    return retval
+
+
+def docurls_from_environment(
+    package: str,
+    session: requests.Session | None = None,
+    env_index: dict[str, importlib.metadata.Distribution] | None = None,
+) -> dict[str, str]:
     """Checks installed package metadata for documentation URLs.
 
     Arguments:
@@ -89,27 +290,43 @@ def docurls_from_environment(package: str) -> dict[str, str]:
         version: A version such as "stable", "latest" or a formal version
             number parsed by :py:class:`packaging.version.Version`.
 
+        session: If set, then use this HTTP session for reaching out to
+            documentation sites, instead of the one shared by all lookups.
+
+        env_index: If set, then lookup package metadata on this index (see
+            :py:func:`environment_index`) instead of searching ``sys.path``.
+
 
     Returns:
 
         A dictionary, that maps the version of the documentation found on PyPI
         to the URL.
     """
+    http = session or _SESSION
     try:
-        md = importlib.metadata.metadata(package)
+        if env_index is None:
+            md = importlib.metadata.metadata(package)
+        else:
+            dist = env_index.get(packaging.utils.canonicalize_name(package))
+            if dist is None:
+                raise importlib.metadata.PackageNotFoundError(package)
+            md = dist.metadata
         if md.get_all("Project-URL") is None:
             return {}
         for k in md.get_all("Project-URL"):
             if k.startswith(("documentation, ", "Documentation, ")):
                 raw_addr = k.split(",", 1)[1].strip()
                 # Find the final address after eventual redirects.
-                redirected = requests.head(
+                redirected = _head(
+                    http,
                     raw_addr,
                     allow_redirects=True,
                     headers={"Accept-Encoding": ""},  # Fixes issue on some links
                 )
+                if redirected is None:
+                    continue
                 addr = _ensure_webdir(redirected.url)
-                if requests.head(addr + "objects.inv").ok:
+                if _has_inventory(http, addr):
                     try:
                         return {md["version"]: addr}
                     except KeyError:
@@ -121,7 +338,13 @@ def docurls_from_environment(package: str) -> dict[str, str]:
     return {}
 
 
-def docurls_from_rtd(package: str) -> dict[str, str]:
+_HTML_PARSER = lxml.html.HTMLParser(collect_ids=False)
+"""HTML parser for readthedocs.org pages - element ids are not used."""
+
+
+def docurls_from_rtd(
+    package: str, session: requests.Session | None = None
+) -> dict[str, str]:
     """Checks readthedocs.org for documentation pointers for the package.
 
     Arguments:
@@ -130,6 +353,9 @@ def docurls_from_rtd(package: str) -> dict[str, str]:
             name it is know at rtd.org and not necessarily the package name.
             Some packages do have different names on rtd.org.
 
+        session: If set, then use this HTTP session for reaching out to
+            readthedocs.org, instead of the one shared by all lookups.
+
 
     Returns:
 
@@ -140,14 +366,11 @@ def docurls_from_rtd(package: str) -> dict[str, str]:
     try:
         url = f"https://readthedocs.org/projects/{package}/versions/"
         logger.debug(f"Reaching for `{url}'...")
-        r = requests.get(f"https://readthedocs.org/projects/{package}/versions/")
-        if r.ok:
-            tree = lxml.html.fromstring(r.text)
-            return {
-                k.text: _ensure_webdir(k.attrib["href"])
-                for k in tree.xpath("//a[contains(@class, 'module-item-title')]")
-                if k.attrib["href"].startswith("http")
-            }
+        versions = _cache.conditional_get(
+            session or _SESSION, url, _TIMEOUT, _parse_rtd_versions
+        )
+        if versions is not None:
+            return versions
 
     except requests.exceptions.RequestException:
         pass
@@ -155,26 +378,56 @@ def docurls_from_rtd(package: str) -> dict[str, str]:
     return {}
 
 
-def _get_json(url: str) -> dict | None:
+def _parse_rtd_versions(contents: bytes) -> dict[str, str]:
+    """Parses the versions page of a project on readthedocs.org."""
+    tree = lxml.html.document_fromstring(contents, parser=_HTML_PARSER)
+    return {
+        k.text: _ensure_webdir(k.attrib["href"])
+        for k in tree.xpath("//a[contains(@class, 'module-item-title')]")
+        if k.attrib["href"].startswith("http")
+    }
+
+
+def _parse_pypi_json(contents: bytes) -> dict:
+    """Parses a response of the PyPI JSON API, keeping only what is used.
+
+    Full responses list all files of all releases, and may be several
+    megabytes long.  Only the version, project URLs and release names
+    are kept, which are also what gets cached.
+    """
+    data = _json_loads(contents)
+    return {
+        "info": {
+            "version": data["info"]["version"],
+            "project_urls": data["info"]["project_urls"] or {},
+        },
+        "releases": {k: [] for k in data.get("releases", {})},
+    }
+
+
+def _get_pypi_json(url: str, session: requests.Session | None = None) -> dict | None:
     try:
         logger.debug(f"Reaching for `{url}'...")
-        r = requests.get(url)
-        if r.ok:
-            return r.json()
+        return _cache.conditional_get(
+            session or _SESSION, url, _TIMEOUT, _parse_pypi_json
+        )
 
-    except requests.exceptions.RequestException:
+    except (requests.exceptions.RequestException, ValueError, KeyError):
         pass
 
     return None
 
 
-def docurls_from_pypi(package: str, max_entries: int) -> dict[str, str]:
+def docurls_from_pypi(
+    package: str, max_entries: int, session: requests.Session | None = None
+) -> dict[str, str]:
     """Checks PyPI for documentation pointers for a given package.
 
     This procedure first looks up the main repo JSON entry, and then figures
     out all available versions of the package.  In a second step, and depending
     on the value of ``max_entries``, this function will retrieve the latest
-    ``max_entries`` available on that particular package.
+    ``max_entries`` available on that particular package.  Releases are
+    probed concurrently.
 
 
     Arguments:
@@ -187,52 +440,89 @@ def docurls_from_pypi(package: str, max_entries: int) -> dict[str, str]:
             the information from the last ``max_entries`` releases.  Finally, a
             negative value will imply the download of all available releases.
 
+        session: If set, then use this HTTP session for reaching out to PyPI
+            and documentation sites, instead of the one shared by all lookups.
+
 
     Returns:
 
         A dictionary, that maps the version of the documentation found on PyPI
         to the URL.
     """
+    http = session or _SESSION
     versions: dict[str, str] = {}
-    data = _get_json(f"https://pypi.org/pypi/{package}/json")
+    data = _get_pypi_json(f"https://pypi.org/pypi/{package}/json", session)
     if data is None:
         return versions
 
+    # maps documentation addresses to the availability of objects.inv there
+    checked: dict[str, bool] = {}
+
     urls = data["info"]["project_urls"]
     addr = urls.get("Documentation") or urls.get("documentation")
     if addr is not None:
         # Find the final address after eventual redirects.
-        redirected = requests.head(
+        redirected = _head(
+            http,
             addr,
             allow_redirects=True,
             headers={"Accept-Encoding": ""},  # Fixes issue on some links
         )
-        addr = _ensure_webdir(redirected.url)
-        if requests.head(addr + "objects.inv").ok:
-            versions[data["info"]["version"]] = addr
+        if redirected is not None:
+            addr = _ensure_webdir(redirected.url)
+            checked[addr] = _has_inventory(http, addr)
+            if checked[addr]:
+                versions[data["info"]["version"]] = addr
 
     # download further versions, if requested by user
     version_map = {
-        packaging.version.Version(k): k
+        version: k
         for k in data["releases"].keys()
-        if PEP440_RE.match(k)
+        if _looks_like_version(k) and (version := _parse_version(k)) is not None
     }
     versions_to_probe = sorted(list(version_map.keys()), reverse=True)
 
     if max_entries >= 0:
         versions_to_probe = versions_to_probe[:max_entries]
 
-    for k in versions_to_probe:
-        data = _get_json(f"https://pypi.org/pypi/{package}/{version_map[k]}/json")
+    def _candidate(version: str) -> tuple[str, str] | None:
+        data = _get_pypi_json(f"https://pypi.org/pypi/{package}/{version}/json", http)
         if data is None:
-            continue
+            return None
 
         urls = data["info"]["project_urls"]
         addr = urls.get("Documentation") or urls.get("documentation")
-        if addr is not None:
-            addr = _ensure_webdir(addr)
-            if requests.head(addr + "objects.inv").ok:
-                versions[data["info"]["version"]] = addr
+        if addr is None:
+            return None
+        return data["info"]["version"], _ensure_webdir(addr)
+
+    if not versions_to_probe:
+        return versions
+
+    # releases are probed concurrently, as lookups are I/O bound.  Results are
+    # merged in order of decreasing version.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(_MAX_WORKERS, len(versions_to_probe))
+    ) as executor:
+        candidates = [
+            k
+            for k in executor.map(
+                _candidate, [version_map[k] for k in versions_to_probe]
+            )
+            if k is not None
+        ]
+
+        # many releases share the same documentation URL: check each only once
+        unique = [
+            k for k in dict.fromkeys(addr for _, addr in candidates) if k not in checked
+        ]
+        checked.update(
+            zip(unique, executor.map(functools.partial(_has_inventory, http), unique))
+        )
+
+    for release, addr in candidates:
+        if checked[addr]:
+            versions[release] = addr
 
     return versions
 
@@ -260,23 +550,36 @@ class Catalog(collections.abc.MutableMapping):
         _data: Internal dictionary containing the mapping between package names
             the user can refer to, versions and eventual sources of such
             information.
+
+        _dirty: Indicates if the contents were changed since the catalog was
+            last loaded or dumped.
+
+        _origin: Location of the file the contents were loaded from, or
+            ``None``, if not loaded from a file.
     """
 
+    __slots__ = ("_data", "_dirty", "_origin")
+
     _data: dict[str, PackageDictionaryType]
+    _dirty: bool
+    _origin: str | None
 
     def __init__(self) -> None:
         self.reset()
 
-    def load(self, path: pathlib.Path) -> None:
+    def load(self, path: pathlib.Path | importlib.abc.Traversable) -> None:
         """Loads and replaces contents with those from the file."""
-        with path.open("rt") as f:
-            logger.debug(f"Loading package catalog from {str(path)}...")
-            self._data = json.load(f)
-            logger.debug(f"Loaded {len(self)} entries from {str(path)}")
+        logger.debug(f"Loading package catalog from {str(path)}...")
+        self._data = _json_loads(path.read_bytes())
+        self._dirty = False
+        self._origin = str(path.resolve() if isinstance(path, pathlib.Path) else path)
+        logger.debug(f"Loaded {len(self)} entries from {str(path)}")
 
-    def loads(self, contents: str) -> None:
+    def loads(self, contents: str | bytes) -> None:
         """Loads and replaces contents with those from the string."""
-        self._data = json.loads(contents)
+        self._data = _json_loads(contents)
+        self._dirty = False
+        self._origin = None
         logger.debug(f"Loaded {len(self)} entries from string")
 
     def dump(self, path: pathlib.Path) -> None:
@@ -286,20 +589,36 @@ class Catalog(collections.abc.MutableMapping):
             logger.debug(f"Backing up: {str(path)} -> {str(backup)}...")
             shutil.copy(path, backup)  # backup
 
-        with path.open("wt") as f:
-            logger.debug(
-                f"Saving package catalog with {len(self)} entries at {str(path)}..."
-            )
-            json.dump(self._data, f, indent=2)
-            f.write("\n")  # avoids pre-commit/self-update conflicting changes
+        logger.debug(
+            f"Saving package catalog with {len(self)} entries at {str(path)}..."
+        )
+        # the final newline avoids pre-commit/self-update conflicting changes
+        path.write_bytes(_json_dumps(self._data, newline=True))
+        self._dirty = False
 
     def dumps(self) -> str:
         """Loads and replaces contents with those from the string."""
-        return json.dumps(self._data, indent=2)
+        return dumps(self._data)
+
+    def content_hash(self) -> bytes:
+        """Returns a BLAKE2b digest of the contents :py:meth:`dump` writes.
+
+        This allows checking if a file on disk matches the current
+        contents of this catalog by comparing digests, without decoding
+        the file.
+        """
+        return hashlib.blake2b(_json_dumps(self._data, newline=True)).digest()
 
     def reset(self) -> None:
         """Full resets internal catalog."""
         self._data = {}
+        self._dirty = False
+        self._origin = None
+
+    @property
+    def dirty(self) -> bool:
+        """Indicates if contents changed since last loaded or dumped."""
+        return self._dirty
 
     # mutable mapping operations, so this looks like a dictionary
     def __getitem__(self, key: str) -> PackageDictionaryType:
@@ -311,10 +630,17 @@ class Catalog(collections.abc.MutableMapping):
         return ret
 
     def __setitem__(self, key: str, value: PackageDictionaryType) -> None:
+        if self._data.get(key) != value:
+            self._dirty = True
         self._data[key] = value
 
     def __delitem__(self, key: str) -> None:
         del self._data[key]
+        self._dirty = True
+
+    def __contains__(self, key: object) -> bool:
+        # avoids the URL normalisation in __getitem__()
+        return key in self._data
 
     def __len__(self) -> int:
         return len(self._data)
@@ -327,11 +653,64 @@ class Catalog(collections.abc.MutableMapping):
 
     def _ensure_defaults(self, pkg: str) -> None:
         """Ensures a standardised setup for a package entry."""
-        self.setdefault(pkg, {"versions": {}, "sources": {}})
-        self[pkg].setdefault("versions", {})
-        self[pkg].setdefault("sources", {})
+        # nota bene: avoids __getitem__(), that also normalises URLs
+        entry = self._data.get(pkg)
+        if entry is None:
+            self._data[pkg] = {"versions": {}, "sources": {}}
+            self._dirty = True
+        else:
+            entry.setdefault("versions", {})
+            entry.setdefault("sources", {})
 
-    def update_versions_from_environment(self, pkg: str, name: str | None) -> bool:
+    def _merge_versions(
+        self,
+        pkg: str,
+        source: str,
+        name: str,
+        versions: dict[str, str],
+        reorder: bool = True,
+    ) -> None:
+        """Merges versions found at a given source into a package entry."""
+        # nota bene: avoids __getitem__(), that also normalises URLs
+        entry = self._data[pkg]
+        merged = {**entry["versions"], **versions}
+        if reorder:
+            merged = _reorder_versions(merged)
+        if (
+            _normalize_urls(merged) != _normalize_urls(entry["versions"])
+            or entry["sources"].get(source) != name
+        ):
+            self._dirty = True
+        entry["versions"] = merged
+        entry["sources"][source] = name
+
+    def merge(self, other: Catalog) -> None:
+        """Merges package entries from another catalog into this one.
+
+        Versions and sources found in ``other`` are added to those of the same
+        package in this catalog, instead of replacing the whole entry.
+        """
+        for pkg, entry in other._data.items():
+            self._ensure_defaults(pkg)
+            for source, name in entry.get("sources", {}).items():
+                self._merge_versions(pkg, source, name, entry["versions"])
+
+    def _reorder(self, pkg: str) -> None:
+        """Re-orders versions of a package entry by decreasing version."""
+        entry = self._data[pkg]
+        reordered = _reorder_versions(entry["versions"])
+        if list(reordered.items()) != list(entry["versions"].items()):
+            self._dirty = True
+        entry["versions"] = reordered
+
+    def update_versions_from_environment(
+        self,
+        pkg: str,
+        name: str | None,
+        session: requests.Session | None = None,
+        env_index: dict[str, importlib.metadata.Distribution] | None = None,
+        reorder: bool = True,
+    ) -> bool:
         """Replaces package documentation URLs using information from current
         Python environment.
 
@@ -346,6 +725,17 @@ class Catalog(collections.abc.MutableMapping):
                 the Python package itself. If this value is set to ``None``,
                 then we just use ``pkg`` as the name to lookup.
 
+            session: If set, then use this HTTP session for reaching out to
+                documentation sites, instead of the one shared by all lookups.
+
+            env_index: If set, then lookup package metadata on this index (see
+                :py:func:`environment_index`) instead of searching
+                ``sys.path``.
+
+            reorder: If set to ``False``, then do not re-order versions after
+                merging new ones.  Use this if more sources are to be merged,
+                re-ordering only once at the end.
+
 
         Returns:
 
@@ -359,19 +749,24 @@ class Catalog(collections.abc.MutableMapping):
 
         logger.debug(f"{pkg}: checking current Python environment for {name}...")
 
-        versions = docurls_from_environment(name)
+        versions = docurls_from_environment(name, session, env_index)
         logger.debug(
             f"{pkg}: Found {len(versions)} doc URL(s) at current Python environment"
         )
 
         if versions:
-            self[pkg]["versions"].update(versions)
-            self[pkg]["versions"] = _reorder_versions(self[pkg]["versions"])
-            self[pkg]["sources"]["environment"] = name
+            self._merge_versions(pkg, "environment", name, versions, reorder)
 
         return len(versions) > 0
 
-    def update_versions_from_rtd(self, pkg: str, name: str | None) -> bool:
+    def update_versions_from_rtd(
+        self,
+        pkg: str,
+        name: str | None,
+        cached: bool = False,
+        session: requests.Session | None = None,
+        reorder: bool = True,
+    ) -> bool:
         """Replaces package documentation URLs using information from
         readthedocs.org.
 
@@ -384,6 +779,16 @@ class Catalog(collections.abc.MutableMapping):
                 If this value is set to ``None``, then we just use ``pkg`` as
                 the name to lookup.
 
+            cached: If set to ``True``, then use (and update) the persistent
+                lookup cache instead of always reaching readthedocs.org.
+
+            session: If set, then use this HTTP session for reaching out to
+                readthedocs.org.
+
+            reorder: If set to ``False``, then do not re-order versions after
+                merging new ones.  Use this if more sources are to be merged,
+                re-ordering only once at the end.
+
 
         Returns:
 
@@ -396,18 +801,27 @@ class Catalog(collections.abc.MutableMapping):
 
         logger.debug(f"{pkg}: checking readthedocs.org for {name}...")
 
-        versions = docurls_from_rtd(name)
+        if cached:
+            versions = _cache.lookup(
+                "readthedocs", name, lambda: docurls_from_rtd(name, session)
+            )
+        else:
+            versions = docurls_from_rtd(name, session)
         logger.debug(f"{pkg}: Found {len(versions)} doc URL(s) at readthedocs.org")
 
         if versions:
-            self[pkg]["versions"].update(versions)
-            self[pkg]["versions"] = _reorder_versions(self[pkg]["versions"])
-            self[pkg]["sources"]["readthedocs"] = name
+            self._merge_versions(pkg, "readthedocs", name, versions, reorder)
 
         return len(versions) > 0
 
     def update_versions_from_pypi(
-        self, pkg: str, name: str | None, max_entries: int
+        self,
+        pkg: str,
+        name: str | None,
+        max_entries: int,
+        cached: bool = False,
+        session: requests.Session | None = None,
+        reorder: bool = True,
     ) -> bool:
         """Replaces package documentation URLs using information from pypi.org.
 
@@ -429,6 +843,16 @@ class Catalog(collections.abc.MutableMapping):
                 releases.  Finally, a negative value will imply the download of
                 all available releases.
 
+            cached: If set to ``True``, then use (and update) the persistent
+                lookup cache instead of always reaching pypi.org.
+
+            session: If set, then use this HTTP session for reaching out to
+                pypi.org and documentation sites.
+
+            reorder: If set to ``False``, then do not re-order versions after
+                merging new ones.  Use this if more sources are to be merged,
+                re-ordering only once at the end.
+
 
         Returns:
 
@@ -442,13 +866,18 @@ class Catalog(collections.abc.MutableMapping):
 
         logger.debug(f"{pkg}: checking pypi.org for {name}...")
 
-        versions = docurls_from_pypi(name, max_entries)
+        if cached:
+            versions = _cache.lookup(
+                f"pypi:{max_entries}",
+                name,
+                lambda: docurls_from_pypi(name, max_entries, session),
+            )
+        else:
+            versions = docurls_from_pypi(name, max_entries, session)
         logger.debug(f"{pkg}: Found {len(versions)} doc URL(s) at pypi.org")
 
         if versions:
-            self[pkg]["versions"].update(versions)
-            self[pkg]["versions"] = _reorder_versions(self[pkg]["versions"])
-            self[pkg]["sources"]["pypi"] = name
+            self._merge_versions(pkg, "pypi", name, versions, reorder)
 
         return len(versions) > 0
 
@@ -459,6 +888,8 @@ class Catalog(collections.abc.MutableMapping):
         names: dict[str, dict[str, str]] = {},
         pypi_max_entries: int = 0,
         keep_going: bool = False,
+        session: requests.Session | None = None,
+        max_age: float | None = None,
     ) -> None:
         """Updates versions for a list of packages in this catalog.
 
@@ -470,6 +901,9 @@ class Catalog(collections.abc.MutableMapping):
         2. readthedocs.org (``readthedocs``)
         3. PyPI (``pypi``)
 
+        Packages are looked up concurrently, but results are merged into this
+        catalog in the order packages are listed.
+
 
         Arguments:
 
@@ -501,45 +935,153 @@ class Catalog(collections.abc.MutableMapping):
                 the flag ``keep_going`` is set to ``True`` (defaults to
                 ``False``), then it merges information from all sources.  Note
                 that some of this information may be repetitive.
+
+            session: If set, then use this HTTP session for reaching out to
+                websites, instead of the one shared by all lookups.
+
+            max_age: If set, then skip packages that are already in this
+                catalog, and that were last updated less than ``max_age``
+                seconds ago for the same catalog file (by any process on this
+                machine).  Update times are only recorded if this is set.
+                Catalogs not loaded from a file are never skipped.
+        """
+
+        order = list(order)
+        pkgs = list(pkgs)
+        if max_age:
+            pkgs = [k for k in pkgs if not self._checked_recently(k, max_age)]
+        if not pkgs:
+            return
+
+        # snapshot installed distributions only once for all lookups
+        env_index = environment_index() if "environment" in order else None
+
+        # lookups are I/O bound, so packages are updated concurrently.  Each
+        # package is updated on a private catalog, that is merged back in the
+        # order packages were listed, so this catalog is only ever modified by
+        # this thread
+        diffs: list[tuple[str, Catalog, concurrent.futures.Future]] = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_lookup_workers(pypi_max_entries), len(pkgs))
+        ) as executor:
+            for pkg in pkgs:
+                diff = Catalog()
+                if pkg in self._data:
+                    diff._data[pkg] = copy.deepcopy(self._data[pkg])
+                future = executor.submit(
+                    diff._update_package,
+                    pkg,
+                    order,
+                    names,
+                    pypi_max_entries,
+                    keep_going,
+                    session,
+                    env_index,
+                )
+                diffs.append((pkg, diff, future))
+
+        for pkg, diff, future in diffs:
+            found = future.result()  # re-raises eventual errors
+            if pkg in diff._data:
+                self._data[pkg] = diff._data[pkg]
+                self._dirty = self._dirty or diff._dirty
+            if max_age and found and self._origin is not None:
+                _cache.touch("checked", f"{self._origin}:{pkg}")
+
+    def _checked_recently(self, pkg: str, max_age: float) -> bool:
+        """Tells if a package in this catalog was updated less than ``max_age``
+        seconds ago."""
+        if pkg not in self._data or self._origin is None:
+            return False
+        age = _cache.age("checked", f"{self._origin}:{pkg}")
+        if age is not None and age < max_age:
+            logger.debug(f"{pkg}: last updated {age:.0f}s ago, skipping")
+            return True
+        return False
+
+    def _update_package(
+        self,
+        pkg: str,
+        order: list[str],
+        names: dict[str, dict[str, str]],
+        pypi_max_entries: int,
+        keep_going: bool,
+        session: requests.Session | None,
+        env_index: dict[str, importlib.metadata.Distribution] | None,
+    ) -> bool:
+        """Updates versions for a single package in this catalog.
+
+        See :py:meth:`update_versions` for a description of the arguments.
+        Returns ``True`` if documentation URLs were found for the package.
         """
+        found = False
+        for action in order:
+            if action == "environment":
+                name = names.get(action, {}).get(pkg, pkg)
+                if name is not None:
+                    ok = self.update_versions_from_environment(
+                        pkg,
+                        name,
+                        session=session,
+                        env_index=env_index,
+                        reorder=False,
+                    )
+                    found = found or ok
+                    if ok and not keep_going:
+                        break
+
+            elif action == "readthedocs":
+                name = names.get(action, {}).get(pkg, pkg)
+                if name is not None:
+                    ok = self.update_versions_from_rtd(
+                        pkg, name, session=session, reorder=False
+                    )
+                    found = found or ok
+                    if ok and not keep_going:
+                        break
+
+            elif action == "pypi":
+                name = names.get(action, {}).get(pkg, pkg)
+                if name is not None:
+                    ok = self.update_versions_from_pypi(
+                        pkg,
+                        name,
+                        pypi_max_entries,
+                        session=session,
+                        reorder=False,
+                    )
+                    found = found or ok
+                    if ok and not keep_going:
+                        break
+
+            else:
+                raise RuntimeError(f"Unrecognized source: {action}")
+
+        # re-order versions only once, after merging all sources
+        if found:
+            self._reorder(pkg)
+
+        return found
+
+    def self_update(self, max_age: float | None = None) -> None:
+        """Runs a self-update procedure, by re-looking up known sources.
 
-        for pkg in pkgs:
-            for action in order:
-                if action == "environment":
-                    name = names.get(action, {}).get(pkg, pkg)
-                    if name is not None:
-                        ok = self.update_versions_from_environment(pkg, name)
-                        if ok and not keep_going:
-                            break
-
-                elif action == "readthedocs":
-                    name = names.get(action, {}).get(pkg, pkg)
-                    if name is not None:
-                        ok = self.update_versions_from_rtd(pkg, name)
-                        if ok and not keep_going:
-                            break
-
-                elif action == "pypi":
-                    name = names.get(action, {}).get(pkg, pkg)
-                    if name is not None:
-                        ok = self.update_versions_from_pypi(pkg, name, pypi_max_entries)
-                        if ok and not keep_going:
-                            break
-
-                else:
-                    raise RuntimeError(f"Unrecognized source: {action}")
-
-    def self_update(self) -> None:
-        """Runs a self-update procedure, by re-looking up known sources."""
+        Arguments:
+
+            max_age: If set, then skip packages that were last updated less
+                than ``max_age`` seconds ago (see :py:meth:`update_versions`).
+                By default, all packages are updated.
+        """
         # organises the names as expected by update_versions()
         names: dict[str, dict[str, str]] = dict(environment={}, readthedocs={}, pypi={})
         for pkg, info in self.items():
             for src in ("environment", "readthedocs", "pypi"):
                 names[src][pkg] = info["sources"].get(src)
 
-        self.update_versions(pkgs=self.keys(), names=names)
+        self.update_versions(pkgs=self.keys(), names=names, max_age=max_age)
 
 
+@functools.lru_cache(maxsize=4096)
 def _string2version(v: str) -> packaging.version.Version | None:
     """Converts a string into a version number.
 
@@ -560,11 +1102,20 @@ def _string2version(v: str) -> packaging.version.Version | None:
 
         Either ``None``, or the version object with the parsed version.
     """
-    v = v.replace(".x", "")
-    try:
-        return packaging.version.Version(v)
-    except packaging.version.InvalidVersion:
-        return None
+    return _parse_version(v.replace(".x", ""))
+
+
+_LATEST_ALIASES = ("latest", "stable", "master", "main")
+"""Version aliases to use for ``latest``, in order of preference."""
+
+_STABLE_ALIASES = ("stable", "latest", "master", "main")
+"""Version aliases to use for ``stable``, in order of preference."""
+
+
+def _first_alias(versions: dict[str, str], aliases: tuple[str, ...]) -> str:
+    """Returns the first non-empty URL for any of the aliases, or an empty
+    string."""
+    return next((versions[k] for k in aliases if versions.get(k)), "")
 
 
 def _prepare_versions(versions: dict[str, str]) -> dict[str, str]:
@@ -592,9 +1143,13 @@ def _prepare_versions(versions: dict[str, str]) -> dict[str, str]:
     if not versions:
         return versions
 
-    # see what each valid number means
-    version_map = {_string2version(k): k for k in versions.keys()}
-    sorted_versions = sorted([k for k in version_map.keys() if k is not None])
+    # see what each valid number means, ignoring aliases
+    version_map: dict[packaging.version.Version, str] = {}
+    for name in versions:
+        parsed = _string2version(name)
+        if parsed is not None:
+            version_map[parsed] = name
+    sorted_versions = sorted(version_map)
 
     retval: dict[str, str] = {}
     if sorted_versions:
@@ -602,41 +1157,32 @@ def _prepare_versions(versions: dict[str, str]) -> dict[str, str]:
         latest = sorted_versions[-1]
         retval["latest"] = versions.get("latest", versions[version_map[latest]])
 
-        stable_versions = [
-            k for k in sorted_versions if not (k.is_prerelease or k.is_devrelease)
-        ]
-        if stable_versions:
-            stable = stable_versions[-1]
-        else:
-            stable = latest
+        stable = next(
+            (
+                v
+                for v in reversed(sorted_versions)
+                if not (v.is_prerelease or v.is_devrelease)
+            ),
+            latest,
+        )
         retval["stable"] = versions.get("stable", versions[version_map[stable]])
 
         # fill-in the remainder of the versions, leave latest on top
-        for k in reversed(sorted_versions):
-            retval[version_map[k]] = versions[version_map[k]]
-            if ".x" in version_map[k]:
+        for version in reversed(sorted_versions):
+            name = version_map[version]
+            url = versions[name]
+            retval[name] = url
+            if ".x" in name:
                 # copy to a shortened version number as well
-                retval[version_map[k].replace(".x", "")] = versions[version_map[k]]
-            elif k.public != version_map[k]:
+                retval[name.replace(".x", "")] = url
+            elif version.public != name:
                 # copy a standardised version number as well
-                retval[k.public] = versions[version_map[k]]
+                retval[version.public] = url
 
     else:
         # there is either nothing, or just aliases such as stable/latest
-        retval["latest"] = (
-            versions.get("latest")
-            or versions.get("stable")
-            or versions.get("master")
-            or versions.get("main")
-            or ""
-        )
-        retval["stable"] = (
-            versions.get("stable")
-            or versions.get("latest")
-            or versions.get("master")
-            or versions.get("main")
-            or ""
-        )
+        retval["latest"] = _first_alias(versions, _LATEST_ALIASES)
+        retval["stable"] = _first_alias(versions, _STABLE_ALIASES)
 
     return retval
 
@@ -653,6 +1199,11 @@ class LookupCatalog:
         self._catalog = catalog
         self.reset()
 
+    @property
+    def catalog(self) -> Catalog:
+        """The catalog used as base for the lookup."""
+        return self._catalog
+
     def reset(self):
         """Internally creates all possible aliases for package names and
         versions.
@@ -667,14 +1218,68 @@ class LookupCatalog:
         """
         self._version_map: dict[str, dict[str, str]] = {}
         self._package_map: dict[str, str] = {}
+        self._normalized_map: dict[str, str] = {}
         for pkg in self._catalog.keys():
-            self._version_map[pkg] = _prepare_versions(self._catalog[pkg]["versions"])
+            self._index(pkg)
 
-            # translations from Python, rtd.org or pypi.org names
-            self._package_map[pkg] = pkg
-            self._package_map.update(
-                {v: pkg for v in self._catalog[pkg]["sources"].values()}
-            )
+    def _index(self, pkg: str) -> None:
+        """Creates all possible aliases for a single package name and its
+        versions.
+
+        Version aliases are only created on first access to the package (see
+        :py:meth:`_versions`), as lookups typically concern just a few of the
+        packages in the catalog.
+        """
+        self._version_map.pop(pkg, None)
+
+        # translations from Python, rtd.org or pypi.org names
+        aliases = [pkg, *self._catalog[pkg]["sources"].values()]
+        self._package_map.update({k: pkg for k in aliases})
+
+        # the same, but using canonical (PEP 503) names
+        self._normalized_map.update(
+            {packaging.utils.canonicalize_name(k): pkg for k in aliases}
+        )
+
+    def invalidate(self, pkg: str) -> None:
+        """Re-creates aliases for a single package name and its versions.
+
+        Use this method instead of :py:meth:`reset` when only the entry for
+        ``pkg`` changed on the associated catalog, to avoid re-creating aliases
+        for all other packages.
+
+
+        Arguments:
+
+            pkg: The package name, as available on the catalog.
+        """
+        if pkg in self._catalog:
+            self._index(pkg)
+        else:
+            # package was removed from the catalog, also drop its aliases
+            self._version_map.pop(pkg, None)
+            for m in (self._package_map, self._normalized_map):
+                for k in [k for k, v in m.items() if v == pkg]:
+                    del m[k]
+
+    def _versions(self, pkg: str) -> dict[str, str]:
+        """Returns all possible aliases for the versions of a single package,
+        creating them if necessary.
+
+        Arguments:
+
+            pkg: The package name, as available on the catalog.
+        """
+        retval = self._version_map.get(pkg)
+        if retval is None:
+            retval = _prepare_versions(self._catalog[pkg]["versions"])
+            self._version_map[pkg] = retval
+        return retval
+
+    def __contains__(self, pkg: str) -> bool:
+        """Checks if a package name, or its canonical (PEP 503) form, is
+        known."""
+        return pkg in self._package_map or pkg in self._normalized_map
 
     def get(self, pkg: str, version: str | None, default: typing.Any = None):
         """Accesses one single ``pkg/version`` documentation URL.
@@ -682,7 +1287,9 @@ class LookupCatalog:
         Arguments:
 
             pkg: The package name, as available on the catalog or through one
-              of its environment, readthedocs.org or pypi.org names.
+              of its environment, readthedocs.org or pypi.org names.  If there
+              is no exact match, the canonical (PEP 503) form of the name is
+              also tried.
 
             version: The version of the package to search for.  This must be
               either an identifier from readthedocs.org or pypi.org, or a valid
@@ -697,8 +1304,41 @@ class LookupCatalog:
             If a match is found, returns the URL for the documentation.
             Otherwise, returns the ``default`` value.
         """
-        if pkg not in self._package_map:
-            return default
-        if version not in self._version_map[pkg]:
+        real = self._package_map.get(pkg)
+        if real is None:
+            real = self._normalized_map.get(packaging.utils.canonicalize_name(pkg))
+            if real is None:
+                return default
+        return self._versions(real).get(version, default)
+
+    def get_normalized(self, pkg: str, version: str | None, default: typing.Any = None):
+        """Accesses one single ``pkg/version`` documentation URL, using a
+        canonical package name.
+
+        This method is equivalent to :py:meth:`get`, but skips package name
+        canonicalization, which is useful if the same name is to be looked up
+        several times.
+
+
+        Arguments:
+
+            pkg: The canonical (PEP 503) package name, as returned by
+              :py:func:`packaging.utils.canonicalize_name`.
+
+            version: The version of the package to search for.  This must be
+              either an identifier from readthedocs.org or pypi.org, or a valid
+              PEP-440 version number as a string.
+
+            default: The default value to return in case we do not find a
+            match.
+
+
+        Returns:
+
+            If a match is found, returns the URL for the documentation.
+            Otherwise, returns the ``default`` value.
+        """
+        real = self._normalized_map.get(pkg)
+        if real is None:
             return default
-        return self._version_map[self._package_map[pkg]][version]
+        return self._versions(real).get(version, default)
@@ -5,125 +5,191 @@
 from __future__ import annotations  # not required for Python >= 3.10
 
 import argparse
-import importlib.resources
-import json
+import concurrent.futures
+import functools
 import pathlib
 import textwrap
+import typing
 
-from . import oneliner
-from .catalog import (
-    Catalog,
-    docurls_from_environment,
-    docurls_from_pypi,
-    docurls_from_rtd,
-)
+from . import _builtin_lookup, oneliner
 from .update_catalog import setup_verbosity
 
+_SourceType = tuple[str, typing.Callable[[str], dict[str, str]]]
+"""A description of an online source, and the function to look it up."""
+
+
+def _lookup(
+    p: str, sources: list[_SourceType], keep_going: bool
+) -> list[tuple[str, dict[str, str]]]:
+    """Looks up documentation for a package on various online sources.
+
+    Arguments:
+
+        p: Name of the package to look up
+
+        sources: Online sources to probe, in order of priority
+
+        keep_going: If set, then probe all sources, instead of stopping at the
+            first one providing documentation URLs.
+
+
+    Returns:
+
+        A list of tuples containing the description of each probed source and
+        the versions found there.
+    """
+    retval: list[tuple[str, dict[str, str]]] = []
+    for description, docurls in sources:
+        versions = docurls(p)
+        retval.append((description, versions))
+        if versions and not keep_going:
+            break
+    return retval
+
+
+def _print_versions(versions: dict[str, str]) -> None:
+    """Prints versions found for a package."""
+    from .catalog import dumps
+
+    # the JSON output never contains empty lines, so each newline starts a new
+    # line to prefix
+    print("  | " + dumps(versions).replace("\n", "\n  | "))
+
 
 def _main(args) -> None:
     """Main function, that actually executes the check-package command."""
     setup_verbosity(args.verbose)
 
-    builtin_catalog = Catalog()
-    if not args.no_builtin:
-        catalog_file = importlib.resources.files(__name__.split(".", 1)[0]).joinpath(
-            "catalog.json"
-        )
-        builtin_catalog.loads(catalog_file.read_text())
+    from .catalog import (
+        Catalog,
+        docurls_from_environment,
+        docurls_from_pypi,
+        docurls_from_rtd,
+        environment_index,
+        max_lookup_workers,
+    )
 
-    user_catalog = Catalog()
-    if args.user:
-        user_catalog.load(args.user)
+    # the built-in catalog is only read here: share the copy parsed by
+    # previous calls in the same Python process (or by the Sphinx extension)
+    builtin_catalog = Catalog() if args.no_builtin else _builtin_lookup().catalog
 
-    for p in args.packages:
-        if p in user_catalog:
-            print(f"Found {p} in user catalog:")
-            print(
-                textwrap.indent(
-                    json.dumps(user_catalog[p]["versions"], indent=2), "  | "
-                )
+    # catalogs to check, in order of priority - the user catalog is only
+    # created if one was passed
+    checked: list[tuple[str, Catalog]] = []
+    if args.user is not None:
+        user_catalog = Catalog()
+        user_catalog.load(args.user)
+        checked.append(("user", user_catalog))
+    checked.append(("builtin", builtin_catalog))
+
+    # online sources, in order of priority
+    sources: list[_SourceType] = []
+    if not args.no_environment:
+        # installed distributions are only indexed if a package needs to be
+        # looked up there, and then only once for all packages
+        env_index = functools.cache(environment_index)
+        sources.append(
+            (
+                "installed Python environment",
+                lambda p: docurls_from_environment(p, env_index=env_index()),
             )
-            if not args.keep_going:
-                continue
-
-        if p in builtin_catalog:
-            print(f"Found {p} in builtin catalog:")
-            print(
-                textwrap.indent(
-                    json.dumps(builtin_catalog[p]["versions"], indent=2), "  | "
-                )
+        )
+    if not args.no_rtd:
+        sources.append(("readthedocs.org", docurls_from_rtd))
+    if not args.no_pypi:
+        sources.append(
+            (
+                "PyPI",
+                functools.partial(docurls_from_pypi, max_entries=args.pypi_max_entries),
             )
-            if not args.keep_going:
-                continue
-
-        if not args.no_environment:
-            versions = docurls_from_environment(p)
-            if versions:
-                print(f"Found {p} documentation in installed Python environment:")
-                print(textwrap.indent(json.dumps(versions, indent=2), "  | "))
-                if not args.keep_going:
-                    continue
+        )
 
-        if not args.no_rtd:
-            versions = docurls_from_rtd(p)
-            if versions:
-                print(f"Found {p} documentation in readthedocs.org:")
-                print(textwrap.indent(json.dumps(versions, indent=2), "  | "))
-                if not args.keep_going:
-                    continue
-
-        if not args.no_pypi:
-            print(f"Looking up all PyPI versions of {p} - this may be long...")
-            versions = docurls_from_pypi(p, args.pypi_max_entries)
-            if versions:
-                print(f"Found {p} documentation in PyPI:")
-                print(textwrap.indent(json.dumps(versions, indent=2), "  | "))
+    # catalogs listing each package, in order of priority - repeated package
+    # names are only checked and reported once
+    catalogs: dict[str, list[tuple[str, Catalog]]] = {
+        p: [(name, catalog) for name, catalog in checked if p in catalog]
+        for p in args.packages
+    }
+
+    # packages not found on catalogs are looked up online concurrently, as
+    # lookups are I/O bound.  With --keep-going, all sources are probed
+    # concurrently as well.  Results are printed in the order packages were
+    # listed, and in order of priority.
+    pending = [p for p in catalogs if sources and (args.keep_going or not catalogs[p])]
+    if pending:
+        print(f"Looking up {', '.join(pending)} online - this may be long...")
+
+    futures: dict[str, list[concurrent.futures.Future]] = {}
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_lookup_workers(0 if args.no_pypi else args.pypi_max_entries)
+    ) as executor:
+        for p in pending:
+            if args.keep_going:
+                futures[p] = [executor.submit(_lookup, p, [k], True) for k in sources]
+            else:
+                futures[p] = [executor.submit(_lookup, p, sources, False)]
+
+        for p in catalogs:
+            for name, catalog in catalogs[p]:
+                print(f"Found {p} in {name} catalog:")
+                _print_versions(catalog[p]["versions"])
                 if not args.keep_going:
-                    continue
+                    break
 
+            for future in futures.get(p, []):
+                for description, versions in future.result():
+                    if versions:
+                        print(f"Found {p} documentation in {description}:")
+                        _print_versions(versions)
 
-def add_parser(subparsers) -> argparse.ArgumentParser:
-    """Just sets up the parser for this CLI."""
-    prog = "auto-intersphinx check-packages"
 
-    parser = subparsers.add_parser(
-        prog.split()[1],
-        help="Discover documentation cross-references for packages",
-        description="Discover documentation cross-references for packages",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=textwrap.dedent(
-            f"""
-            examples:
+_PROG = "auto-intersphinx check-packages"
+"""Full name of this command."""
 
-            1. Checks internal catalog, Python environment, readthedocs.org and
-               PyPI for package "requests":
+_EPILOG = textwrap.dedent(
+    f"""
+    examples:
 
-               .. code:: sh
+    1. Checks internal catalog, Python environment, readthedocs.org and
+       PyPI for package "requests":
 
-                  {prog} requests
+       .. code:: sh
 
-            2. Checks internal and user catalog, Python environment,
-               readthedocs.org and PyPI for package "requests":
+          {_PROG} requests
 
-               .. code:: sh
+    2. Checks internal and user catalog, Python environment,
+       readthedocs.org and PyPI for package "requests":
 
-                  {prog} --user=doc/catalog.json requests
+       .. code:: sh
 
-            3. Skip internal catalog checks when running for package "requests"
-               (checks readthedocs.org and PyPI only):
+          {_PROG} --user=doc/catalog.json requests
 
-               .. code:: sh
+    3. Skip internal catalog checks when running for package "requests"
+       (checks readthedocs.org and PyPI only):
 
-                  {prog} --no-builtin requests
+       .. code:: sh
 
-            4. Keep looking for references in all available places (do not stop
-               when first finds a documentation link, such as the extension does):
+          {_PROG} --no-builtin requests
 
-               .. code:: sh
+    4. Keep looking for references in all available places (do not stop
+       when first finds a documentation link, such as the extension does):
 
-                  {prog} --keep-going requests
-            """
-        ),
+       .. code:: sh
+
+          {_PROG} --keep-going requests
+    """
+)
+"""Examples shown at the end of the help message of this command."""
+
+
+def add_parser(subparsers) -> argparse.ArgumentParser:
+    """Just sets up the parser for this CLI."""
+    parser = subparsers.add_parser(
+        _PROG.split()[1],
+        help="Discover documentation cross-references for packages",
+        description="Discover documentation cross-references for packages",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
     )
 
     parser.add_argument(
@@ -176,6 +242,7 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
         "-M",
         "--pypi-max-entries",
         default=0,
+        type=int,
         help=oneliner(
             """
             The maximum number of entries to lookup in PyPI.  A value of zero
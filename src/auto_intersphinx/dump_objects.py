@@ -25,40 +25,45 @@ def _main(args) -> None:
         intersphinx.inspect_main([k])
 
 
-def add_parser(subparsers) -> argparse.ArgumentParser:
-    """Just sets up the parser for this CLI."""
-    prog = "auto-intersphinx dump-objects"
+_PROG = "auto-intersphinx dump-objects"
+"""Full name of this command."""
 
-    parser = subparsers.add_parser(
-        prog.split()[1],
-        help="Dumps objects documented in a Sphinx inventory URL",
-        description="Dumps objects documented in a Sphinx inventory URL",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=textwrap.dedent(
-            f"""
-            examples:
+_EPILOG = textwrap.dedent(
+    f"""
+    examples:
+
+    1. Dumps objects documented in a local Sphinx build:
 
-            1. Dumps objects documented in a local Sphinx build:
+       .. code:: sh
 
-               .. code:: sh
+          {_PROG} html/objects.inv
 
-                  {prog} html/objects.inv
 
+    2. Dumps objects documented in python 3.x:
 
-            2. Dumps objects documented in python 3.x:
+       .. code:: sh
 
-               .. code:: sh
+          {_PROG} https://docs.python.org/3/objects.inv
 
-                  {prog} https://docs.python.org/3/objects.inv
 
+    3. Dumps objects documented in numpy:
 
-            3. Dumps objects documented in numpy:
+       .. code:: sh
 
-               .. code:: sh
+          {_PROG} https://docs.scipy.org/doc/numpy/objects.inv
+    """
+)
+"""Examples shown at the end of the help message of this command."""
 
-                  {prog} https://docs.scipy.org/doc/numpy/objects.inv
-            """
-        ),
+
+def add_parser(subparsers) -> argparse.ArgumentParser:
+    """Just sets up the parser for this CLI."""
+    parser = subparsers.add_parser(
+        _PROG.split()[1],
+        help="Dumps objects documented in a Sphinx inventory URL",
+        description="Dumps objects documented in a Sphinx inventory URL",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
     )
 
     parser.add_argument(
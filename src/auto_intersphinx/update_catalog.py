@@ -6,42 +6,69 @@ from __future__ import annotations  # not required for Python >= 3.10
 
 import argparse
 import importlib.abc
-import os
 import pathlib
 import re
 import sys
 import textwrap
-
-import requests
+import typing
 
 from sphinx.util import logging
 
 from . import oneliner
-from .catalog import BUILTIN_CATALOG, Catalog
 
 logger = logging.getLogger(__name__)
 
 
+_SPLIT_RE = re.compile(r"[=\s]+")
+"""Separates package names from version specifiers on requirement lines."""
+
+
+def _iter_requirements(lines: typing.Iterable[str]) -> typing.Iterator[str]:
+    """Yields package names from lines of a pip-requirements file.
+
+    Empty lines and comments are skipped.
+    """
+    for line in lines:
+        k = line.strip()
+        if k and not k.startswith("#"):
+            yield _SPLIT_RE.split(k, maxsplit=1)[0]
+
+
 def _parse_requirements(contents: str) -> list[str]:
     """Parses a pip-requirements file and extracts package lists."""
-    lines = contents.split()
-    lines = [k.strip() for k in lines if not k.strip().startswith("#")]
-    split_re = re.compile(r"[=\s]+")
-    return [split_re.split(k)[0] for k in lines]
+    return list(_iter_requirements(contents.splitlines()))
+
+
+_HANDLER = None
+"""Console handler installed by :py:func:`setup_verbosity`, if any."""
 
 
 def setup_verbosity(verbose: int) -> None:
-    """Sets up logger verbosity."""
+    """Sets up logger verbosity.
+
+    The console handler is only created once, and re-used (pointing to the
+    current ``sys.stdout``) if this function is called again in the same
+    process.  It is (re-)attached to the package logger if needed.
+    """
     import logging as builtin_logging
 
+    global _HANDLER
+
     package_logger = builtin_logging.getLogger("sphinx." + __package__)
 
-    handler = builtin_logging.StreamHandler(sys.stdout)
-    formatter = builtin_logging.Formatter("[%(levelname)s] %(message)s")
-    handler.setFormatter(formatter)
-    handler.setLevel(builtin_logging.DEBUG)
+    if _HANDLER is None:
+        _HANDLER = builtin_logging.StreamHandler(sys.stdout)
+        formatter = builtin_logging.Formatter("[%(levelname)s] %(message)s")
+        _HANDLER.setFormatter(formatter)
+        _HANDLER.setLevel(builtin_logging.DEBUG)
+    else:
+        # nota bene: setStream() would flush the previous stream, that may be
+        # closed by now (e.g. if it was captured)
+        _HANDLER.stream = sys.stdout
+
+    if _HANDLER not in package_logger.handlers:
+        package_logger.addHandler(_HANDLER)
 
-    package_logger.addHandler(handler)
     if verbose == 0:
         package_logger.setLevel(builtin_logging.ERROR)
     elif verbose == 1:
@@ -56,6 +83,13 @@ def _main(args) -> None:
     """Main function, that actually executes the update-catalog command."""
     setup_verbosity(args.verbose)
 
+    import requests
+
+    from .catalog import BUILTIN_CATALOG, Catalog, fetch_lines
+
+    if args.catalog is None:
+        args.catalog = BUILTIN_CATALOG
+
     catalog = Catalog()
 
     if isinstance(args.catalog, str):
@@ -68,32 +102,34 @@ def _main(args) -> None:
                 f"exist. Skipping..."
             )
     elif isinstance(args.catalog, importlib.abc.Traversable):
-        catalog.loads(args.catalog.read_text())
+        catalog.load(args.catalog)
 
     if args.self:
-        catalog.self_update()
+        catalog.self_update(max_age=args.max_age)
 
-    package_list = []
+    package_list: list[str] = []
     for pkg in args.packages:
-        if pkg.startswith("http"):
+        if pkg.startswith(("http://", "https://")):
             logger.info(f"Retrieving package list from `{pkg}'...")
-            r = requests.get(pkg)
-            if r.ok:
-                package_list += _parse_requirements(r.text)
-            else:
+            try:
+                # parses lines as they arrive, without buffering the contents
+                package_list.extend(_iter_requirements(fetch_lines(pkg)))
+            except requests.exceptions.RequestException:
                 logger.error(f"Could not retrieve `{pkg}'")
                 sys.exit(1)
 
-        elif os.path.exists(pkg):
-            with open(pkg) as f:
-                package_list += _parse_requirements(f.read())
-
         else:
-            package_list.append(pkg)
+            # anything that cannot be read as a requirements file is taken as
+            # a package name
+            try:
+                with open(pkg) as f:
+                    package_list.extend(_iter_requirements(f))
+            except (FileNotFoundError, IsADirectoryError):
+                package_list.append(pkg)
 
     if package_list:
         catalog.update_versions(
-            pkgs=package_list,
+            pkgs=dict.fromkeys(package_list),  # removes repeated entries
             pypi_max_entries=args.pypi_max_entries,
             keep_going=args.keep_going,
         )
@@ -106,45 +142,50 @@ def _main(args) -> None:
         print(catalog.dumps())
 
 
-def add_parser(subparsers) -> argparse.ArgumentParser:
-    """Just sets up the parser for this CLI."""
-    prog = "auto-intersphinx update-catalog"
+_PROG = "auto-intersphinx update-catalog"
+"""Full name of this command."""
 
-    parser = subparsers.add_parser(
-        prog.split()[1],
-        help="Updates catalog of intersphinx cross-references",
-        description="Updates catalog of intersphinx cross-references",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=textwrap.dedent(
-            f"""
-            examples:
+_EPILOG = textwrap.dedent(
+    f"""
+    examples:
 
-            1. Updates numpy and scipy from the internal catalog, dumps new
-               catalog to stdout
+    1. Updates numpy and scipy from the internal catalog, dumps new
+       catalog to stdout
 
-               .. code:: sh
+       .. code:: sh
 
-                  {prog} numpy scipy
+          {_PROG} numpy scipy
 
-            2. Self-update internal catalog:
+    2. Self-update internal catalog:
 
-               .. code:: sh
+       .. code:: sh
 
-                  {prog} --self
+          {_PROG} --self
 
-            3. Refresh internal catalog from a remote pip-constraints.txt file:
+    3. Refresh internal catalog from a remote pip-constraints.txt file:
 
-               .. code:: sh
+       .. code:: sh
 
-                  {prog} https://gitlab.idiap.ch/software/idiap-citools/-/raw/main/src/citools/data/pip-constraints.txt
+          {_PROG} https://gitlab.idiap.ch/software/idiap-citools/-/raw/main/src/citools/data/pip-constraints.txt
 
-            4. Run local tests without modifying the package catalog:
+    4. Run local tests without modifying the package catalog:
 
-               .. code:: sh
+       .. code:: sh
 
-                  {prog} --output=testout.json
-            """
-        ),
+          {_PROG} --output=testout.json
+    """
+)
+"""Examples shown at the end of the help message of this command."""
+
+
+def add_parser(subparsers) -> argparse.ArgumentParser:
+    """Just sets up the parser for this CLI."""
+    parser = subparsers.add_parser(
+        _PROG.split()[1],
+        help="Updates catalog of intersphinx cross-references",
+        description="Updates catalog of intersphinx cross-references",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG,
     )
 
     parser.add_argument(
@@ -162,6 +203,19 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
         help="If set, then self-updates catalog entries",
     )
 
+    parser.add_argument(
+        "-A",
+        "--max-age",
+        default=None,
+        type=float,
+        help=oneliner(
+            """
+            When self-updating, skip packages that were last updated less than
+            this number of seconds ago.  By default, all packages are updated.
+            """
+        ),
+    )
+
     parser.add_argument(
         "-o",
         "--output",
@@ -172,8 +226,8 @@ def add_parser(subparsers) -> argparse.ArgumentParser:
     parser.add_argument(
         "-c",
         "--catalog",
-        default=BUILTIN_CATALOG,
-        help="Location of the catalog to update [default: %(default)s]",
+        default=None,
+        help="Location of the catalog to update [default: built-in catalog]",
     )
 
     parser.add_argument(
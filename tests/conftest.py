@@ -2,12 +2,155 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import json
+import logging
 import pathlib
+import re
+import typing
+import zlib
 
-from pytest import fixture
+import responses
+
+from pytest import MonkeyPatch, fixture, mark
+
+
+def pytest_addoption(parser) -> None:
+    parser.addoption(
+        "--live",
+        action="store_true",
+        default=False,
+        help="Reach out to readthedocs.org, PyPI and documentation sites, "
+        "instead of replaying canned responses, and run tests marked with "
+        "'network'",
+    )
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    if config.getoption("--live"):
+        return
+
+    skip = mark.skip(reason="requires network access (use --live to run)")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip)
 
 
 @fixture
 def datadir(request) -> pathlib.Path:
     """Returns the directory in which the test is sitting."""
     return pathlib.Path(request.module.__file__).parents[0] / "data"
+
+
+@fixture(scope="session", autouse=True)
+def lookup_cache(tmp_path_factory) -> typing.Iterator[pathlib.Path]:
+    """Shares cached online lookups between tests.
+
+    Results of readthedocs.org and PyPI lookups (and the pages downloaded for
+    them) are cached by :py:mod:`auto_intersphinx._cache`.  This points that
+    cache to a temporary directory, so each package is only fetched once per
+    test session, without touching the user's cache, and without re-using
+    results from previous sessions.
+    """
+    path = tmp_path_factory.mktemp("cache")
+    with MonkeyPatch.context() as mp:
+        mp.setenv("XDG_CACHE_HOME", str(path))
+        yield path
+
+
+@fixture(autouse=True)
+def package_logger() -> typing.Iterator[logging.Logger]:
+    """Restores the package logger after each test.
+
+    Command-line tests set its level and attach a console handler (see
+    :py:func:`auto_intersphinx.update_catalog.setup_verbosity`), which would
+    otherwise change the output of Sphinx builds run later in the same
+    process.
+    """
+    logger = logging.getLogger("sphinx.auto_intersphinx")
+    level, handlers = logger.level, logger.handlers[:]
+    yield logger
+    logger.setLevel(level)
+    logger.handlers[:] = handlers
+
+
+_RELEASES = ("2.0.0", "1.1.0", "1.0.0")
+"""Releases of every package, as served by the canned PyPI responses."""
+
+
+def _pypi(request) -> tuple[int, dict[str, str], str]:
+    """Replies to PyPI JSON API requests, for any package and release."""
+    match = re.match(r"https://pypi\.org/pypi/([^/]+)/(?:([^/]+)/)?json", request.url)
+    assert match is not None
+    package, release = match.groups()
+    data = {
+        "info": {
+            "version": release or _RELEASES[0],
+            "project_urls": {
+                "Documentation": f"https://{package}.readthedocs.io/en/"
+                f"{release or 'stable'}/"
+            },
+        },
+        "releases": {k: [] for k in _RELEASES},
+    }
+    return 200, {"Content-Type": "application/json"}, json.dumps(data)
+
+
+def _rtd(request) -> tuple[int, dict[str, str], str]:
+    """Replies to readthedocs.org version listings, for any project."""
+    match = re.match(
+        r"https://readthedocs\.org/projects/([^/]+)/versions/", request.url
+    )
+    assert match is not None
+    items = "".join(
+        f'<a class="module-item-title" '
+        f'href="https://{match.group(1)}.readthedocs.io/en/{k}/">{k}</a>'
+        for k in ("latest", "stable") + _RELEASES
+    )
+    return 200, {"Content-Type": "text/html"}, f"<html><body>{items}</body></html>"
+
+
+_INVENTORY = (
+    b"# Sphinx inventory version 2\n"
+    b"# Project: canned\n"
+    b"# Version: 1.0\n"
+    b"# The remainder of this file is compressed using zlib.\n"
+) + zlib.compress(b"")
+"""An (empty) Sphinx inventory, as served by every documentation site."""
+
+
+@fixture
+def canned_http() -> typing.Iterator[responses.RequestsMock]:
+    """Replays canned responses from PyPI, readthedocs.org and documentation
+    sites.
+
+    Every package exists on PyPI and on readthedocs.org, and every
+    documentation site serves an (empty) ``objects.inv`` file.  Tests may
+    register further responses on the yielded mock, or :py:meth:`reset
+    <responses.RequestsMock.reset>` it to register their own only.
+    """
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add_callback(
+            responses.GET, re.compile(r"https://pypi\.org/pypi/.*/json"), _pypi
+        )
+        rsps.add_callback(
+            responses.GET,
+            re.compile(r"https://readthedocs\.org/projects/[^/]+/versions/"),
+            _rtd,
+        )
+        rsps.add(responses.HEAD, re.compile(r"https?://.*"), status=200)
+        rsps.add(
+            responses.GET, re.compile(r"https?://.*/objects\.inv"), body=_INVENTORY
+        )
+        yield rsps
+
+
+@fixture
+def mock_http(request) -> responses.RequestsMock | None:
+    """Same as :py:func:`canned_http`, unless pytest is called with ``--live``.
+
+    In that case, requests are not intercepted, and ``None`` is returned
+    instead.
+    """
+    if request.config.getoption("--live"):
+        return None
+    return request.getfixturevalue("canned_http")
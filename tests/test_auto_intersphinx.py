@@ -2,16 +2,36 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import contextlib
+import io
 import os
 import pathlib
 import re
 import subprocess
 import sys
+import types
 import typing
 
+import pytest
+import sphinx.cmd.build
+
 # this import avoids a pytest warning
 import auto_intersphinx  # noqa: F401
 
+from auto_intersphinx import (
+    _MSG_NOT_FOUND,
+    _MSG_NOT_IN_ENVIRONMENT,
+    _add_index,
+    _builtin_lookup_cached,
+    _inventory_url,
+    _resolve_catalog_path,
+    _resolve_one,
+    rewrap,
+)
+from auto_intersphinx.catalog import Catalog
+
+pytestmark = pytest.mark.usefixtures("mock_http")
+
 
 def _sphinx_build_html(
     dir: pathlib.Path,
@@ -22,9 +42,9 @@ def _sphinx_build_html(
 
     This function will create a temporary directory containing the test
     documents composed of a single RST file and a Sphinx configuration file. It
-    will then call the command-line program ``sphinx-build``, to build the
-    documentation.  It returns the program exit status, the stdout, stderr
-    streams, and a path leading to the root of the document tree.
+    will then run ``sphinx-build`` (in-process), to build the documentation.
+    It returns the program exit status, the stdout, stderr streams, and a path
+    leading to the root of the document tree.
 
     Arguments:
 
@@ -66,17 +86,35 @@ def _sphinx_build_html(
     with open(srcdir / "conf.py", "w") as f:
         f.write("\n".join(pre_conf + list(conf)))
 
-    # runs sphinx
+    # runs sphinx, in-process, so Sphinx and this extension are imported once
     htmldir = dir / "html"
-    proc = subprocess.run(
-        f"sphinx-build -aE -b html {srcdir} {htmldir}".split(),
-        capture_output=True,
-        text=True,
-    )
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        status = sphinx.cmd.build.build_main(
+            ["-aE", "-b", "html", str(srcdir), str(htmldir)]
+        )
 
-    return proc.returncode, proc.stdout, proc.stderr, srcdir, htmldir
+    return status, stdout.getvalue(), stderr.getvalue(), srcdir, htmldir
 
 
+def _populate(confdir: pathlib.Path, packages: list) -> dict:
+    """Runs the extension over a minimal configuration, without Sphinx.
+
+    The user catalog is ``catalog.json``, in ``confdir``.  Returns the
+    resulting intersphinx mapping.
+    """
+    config: typing.Any = types.SimpleNamespace(
+        intersphinx_mapping={},
+        auto_intersphinx_packages=packages,
+        auto_intersphinx_catalog="catalog.json",
+    )
+    app: typing.Any = types.SimpleNamespace(confdir=str(confdir))
+    auto_intersphinx.populate_intersphinx_mapping(app, config)
+    return config.intersphinx_mapping
+
+
+@pytest.mark.network
 def test_basic_functionality(tmp_path) -> None:
     python_version = "%d.%d" % sys.version_info[:2]
     conf = [
@@ -220,6 +258,7 @@ def test_discover_from_internal_catalog(tmp_path) -> None:
     assert (htmldir / "index.html").exists()
 
 
+@pytest.mark.network
 def test_warning_with_internal_catalog(tmp_path) -> None:
     conf = [
         "auto_intersphinx_packages=[('setuptools', '61.0.0')]",
@@ -243,7 +282,12 @@ def test_warning_with_internal_catalog(tmp_path) -> None:
     assert (htmldir / "index.html").exists()
 
 
-def test_error_unknown_package(tmp_path) -> None:
+def test_error_unknown_package(mock_http, tmp_path) -> None:
+    if mock_http is not None:
+        # packages are unknown to readthedocs.org and pypi.org
+        mock_http.reset()
+        mock_http.get(re.compile(r"https://(readthedocs|pypi)\.org/.*"), status=404)
+
     conf = [
         "auto_intersphinx_packages=[('setuptoolx', '61.0.0'), ('dead-beef-xyz')]",
     ]
@@ -294,6 +338,7 @@ def test_discover_from_metadata(tmp_path) -> None:
     assert (htmldir / "index.html").exists()
 
 
+@pytest.mark.network
 def test_create_user_catalog(tmp_path) -> None:
     conf = [
         "auto_intersphinx_packages=['flask']",
@@ -320,3 +365,168 @@ def test_create_user_catalog(tmp_path) -> None:
     assert (srcdir / "catalog.json").exists()
 
     assert (htmldir / "index.html").exists()
+
+
+def test_same_package_at_two_versions(monkeypatch, tmp_path) -> None:
+    # each version is looked up separately, and finds a different URL
+    def _resolve_one(catalog, p, p_norm, v, env_index):
+        catalog[p] = {
+            "versions": {v: f"https://{p}.example.com/{v}/"},
+            "sources": {"readthedocs": p},
+        }
+        return f"https://{p}.example.com/{v}", []
+
+    monkeypatch.setattr(auto_intersphinx, "_resolve_one", _resolve_one)
+    _populate(tmp_path, [("foo", "1.0"), ("foo", "2.0")])
+
+    catalog = Catalog()
+    catalog.load(tmp_path / "catalog.json")
+    assert catalog["foo"]["versions"] == {
+        "2.0": "https://foo.example.com/2.0",
+        "1.0": "https://foo.example.com/1.0",
+    }
+
+
+def test_builtin_catalog_is_loaded_only_if_required(monkeypatch, tmp_path) -> None:
+    (tmp_path / "catalog.json").write_text(
+        '{"foo": {"versions": {"stable": "https://foo.example.com/"}, "sources": {}}}'
+    )
+    # packages found on the user catalog do not require the built-in one
+    monkeypatch.setattr(
+        "auto_intersphinx.catalog.BUILTIN_CATALOG", tmp_path / "missing"
+    )
+    assert "foo" in _populate(tmp_path, ["foo"])
+
+
+def test_log_messages_are_wrapped_after_formatting() -> None:
+    name = "a-package-with-a-rather-long-name@1.0"
+    message = rewrap(_MSG_NOT_FOUND.format(name=name))
+    assert f"`{name}'" in message
+    assert max(len(k) for k in message.split("\n")) <= 80
+
+
+def test_clean_user_catalog_is_not_rewritten(tmp_path) -> None:
+    catalog = Catalog()
+    catalog.loads(
+        '{"foo": {"versions": {"latest": "https://foo.example.com/"}, "sources": {}}}'
+    )
+    catalog_file = tmp_path / "catalog.json"
+    catalog.dump(catalog_file)
+    mtime = catalog_file.stat().st_mtime_ns
+
+    assert "foo" in _populate(tmp_path, ["foo"])
+    assert catalog_file.stat().st_mtime_ns == mtime
+    assert not catalog_file.with_suffix(".json~").exists()
+
+
+def test_missing_user_catalog_is_written(monkeypatch, tmp_path) -> None:
+    def _resolve_one(catalog, p, p_norm, v, env_index):
+        catalog[p] = {
+            "versions": {"latest": f"https://{p}.example.com/"},
+            "sources": {"readthedocs": p},
+        }
+        return f"https://{p}.example.com", []
+
+    monkeypatch.setattr(auto_intersphinx, "_resolve_one", _resolve_one)
+    _populate(tmp_path, ["foo"])
+
+    catalog = Catalog()
+    catalog.load(tmp_path / "catalog.json")
+    assert catalog["foo"]["sources"] == {"readthedocs": "foo"}
+
+
+def test_add_index_ignores_repeated_settings() -> None:
+    mapping: dict[str, tuple[str, str | None]] = {}
+    _add_index(mapping, "foo", "https://foo.example.com")
+    _add_index(mapping, "foo", "https://foo.example.com/")
+    _add_index(mapping, "foo", "https://foo.example.com/2.0", "objects2.inv")
+    assert mapping == {"foo": ("https://foo.example.com", None)}
+
+
+def test_inventory_url() -> None:
+    assert _inventory_url("https://a.org/doc", None) == "https://a.org/doc/objects.inv"
+    assert _inventory_url("https://a.org/doc/", None) == "https://a.org/doc/objects.inv"
+    assert _inventory_url("https://a.org/doc", "o.inv") == "https://a.org/doc/o.inv"
+
+
+def test_resolve_one_stops_at_first_source_found(monkeypatch) -> None:
+    probed: list[str] = []
+
+    def _update(source: str, found: bool):
+        def _method(self, pkg, *args, **kwargs):
+            probed.append(source)
+            if found:
+                self[pkg] = {
+                    "versions": {"stable": f"https://{pkg}.example.com/"},
+                    "sources": {source: pkg},
+                }
+
+        return _method
+
+    monkeypatch.setattr(
+        Catalog, "update_versions_from_environment", _update("environment", False)
+    )
+    monkeypatch.setattr(Catalog, "update_versions_from_rtd", _update("rtd", True))
+    monkeypatch.setattr(Catalog, "update_versions_from_pypi", _update("pypi", True))
+
+    addr, logs = _resolve_one(Catalog(), "foo", "foo", "stable", {})
+    assert addr == "https://foo.example.com"
+    assert probed == ["environment", "rtd"]
+    assert logs == [("info", rewrap(_MSG_NOT_IN_ENVIRONMENT.format(p="foo")))]
+
+
+def test_resolve_catalog_path(tmp_path) -> None:
+    app: typing.Any = types.SimpleNamespace(confdir=str(tmp_path))
+
+    def _path(catalog: str | None) -> pathlib.Path | None:
+        config: typing.Any = types.SimpleNamespace(auto_intersphinx_catalog=catalog)
+        return _resolve_catalog_path(app, config)
+
+    assert _path(None) is None
+    assert _path("catalog.json") == tmp_path / "catalog.json"
+    assert _path("/tmp/catalog.json") == pathlib.Path("/tmp/catalog.json")
+
+
+def test_builtin_catalog_is_parsed_once(tmp_path) -> None:
+    _builtin_lookup_cached.cache_clear()
+    assert "numpy" in _populate(tmp_path / "a", ["numpy"])
+    assert "numpy" in _populate(tmp_path / "b", ["numpy"])
+    assert _builtin_lookup_cached.cache_info().misses == 1
+
+
+def test_import_does_not_load_sphinx_application() -> None:
+    # a new interpreter is required, as this one already loaded Sphinx
+    script = (
+        "import sys, auto_intersphinx; "
+        "assert 'sphinx.application' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_rewrap_does_not_break_long_words() -> None:
+    url = "https://" + "a-very-long-domain-name-" * 4 + ".example.com/docs/stable/"
+    message = rewrap(f"Documentation of this package is available at {url} now")
+    assert message.split("\n") == [
+        "Documentation of this package is available at",
+        url,
+        "now",
+    ]
+
+
+def test_resolve_version_from_pypi_if_not_on_rtd(monkeypatch, tmp_path) -> None:
+    # readthedocs.org knows the package, but only pypi.org lists the version
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(
+        "auto_intersphinx.catalog.docurls_from_environment", lambda *_, **__: {}
+    )
+    monkeypatch.setattr(
+        "auto_intersphinx.catalog.docurls_from_rtd",
+        lambda *_: {"latest": "https://foo.readthedocs.io/en/latest/"},
+    )
+    monkeypatch.setattr(
+        "auto_intersphinx.catalog.docurls_from_pypi",
+        lambda *_: {"2.0.0": "https://foo.example.com/2.0/"},
+    )
+
+    addr, _ = _resolve_one(Catalog(), "foo", "foo", "2.0.0", {})
+    assert addr == "https://foo.example.com/2.0"
@@ -0,0 +1,105 @@
+# SPDX-FileCopyrightText: Copyright © 2022 Idiap Research Institute <contact@idiap.ch>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+import pytest
+import requests
+
+from auto_intersphinx import _cache
+
+
+@pytest.fixture
+def cache_dir(monkeypatch, tmp_path):
+    """Points the lookup cache to an empty, private directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    return _cache.cache_dir()
+
+
+class _InlineThread:
+    """Runs background refreshes synchronously, to check their results."""
+
+    def __init__(self, target, args, daemon):
+        self._target, self._args = target, args
+
+    def start(self):
+        self._target(*self._args)
+
+
+def test_fresh_hit(cache_dir):
+    found = {"1.0": "https://example.com/"}
+    assert _cache.lookup("pypi", "foo", lambda: found) == found
+    assert _cache.lookup("pypi", "foo", lambda: pytest.fail("not cached")) == found
+
+
+def test_stale_hit_is_refreshed(cache_dir, monkeypatch):
+    monkeypatch.setattr(_cache.threading, "Thread", _InlineThread)
+    old = {"1.0": "https://example.com/1.0/"}
+    new = {"2.0": "https://example.com/2.0/"}
+    _cache.lookup("pypi", "foo", lambda: old)
+
+    # stale entries are served, while refreshed in the background
+    monkeypatch.setattr(_cache, "TTL", 0.0)
+    assert _cache.lookup("pypi", "foo", lambda: new) == old
+
+    monkeypatch.setattr(_cache, "TTL", 3600.0)
+    assert _cache.lookup("pypi", "foo", lambda: pytest.fail("not cached")) == new
+
+
+def _offline() -> dict[str, str]:
+    raise requests.exceptions.ConnectionError("offline")
+
+
+@pytest.mark.parametrize("fetch", (dict, _offline), ids=("empty", "error"))
+def test_failed_refresh_keeps_stale(cache_dir, monkeypatch, fetch):
+    monkeypatch.setattr(_cache.threading, "Thread", _InlineThread)
+    old = {"1.0": "https://example.com/1.0/"}
+    _cache.lookup("pypi", "foo", lambda: old)
+
+    monkeypatch.setattr(_cache, "TTL", 0.0)
+    assert _cache.lookup("pypi", "foo", fetch) == old
+
+    monkeypatch.setattr(_cache, "TTL", 3600.0)
+    assert _cache.lookup("pypi", "foo", lambda: pytest.fail("not cached")) == old
+
+
+def test_empty_results_are_not_cached(cache_dir):
+    # lookups return empty results on network errors: retry them next time
+    assert _cache.lookup("pypi", "foo", lambda: {}) == {}
+    assert not cache_dir.exists()
+
+    found = {"1.0": "https://example.com/"}
+    assert _cache.lookup("pypi", "foo", lambda: found) == found
+
+
+class _Session:
+    """HTTP session replaying responses, that records request headers."""
+
+    def __init__(self, *responses: tuple[int, bytes, dict[str, str]]):
+        self._responses = list(responses)
+        self.headers: list[dict[str, str]] = []
+
+    def get(self, url, headers, timeout):
+        self.headers.append(headers)
+        r = requests.Response()
+        r.status_code, r._content, headers = self._responses.pop(0)
+        r.headers.update(headers)
+        return r
+
+
+def test_conditional_get_caches_parsed_result(cache_dir):
+    url = "https://pypi.org/pypi/foo/json"
+    session = _Session(
+        (200, b"a large response", {"ETag": '"v1"'}),
+        (304, b"", {}),
+    )
+
+    parsed = _cache.conditional_get(session, url, (1, 1), len)
+    assert parsed == len(b"a large response")
+    assert b"large" not in b"".join(k.read_bytes() for k in cache_dir.iterdir())
+
+    # not modified: the cached result is used, without parsing again
+    def _unexpected(contents: bytes) -> int:
+        pytest.fail("contents were parsed again")
+
+    assert _cache.conditional_get(session, url, (1, 1), _unexpected) == 16
+    assert session.headers == [{}, {"If-None-Match": '"v1"'}]
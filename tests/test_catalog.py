@@ -0,0 +1,540 @@
+# SPDX-FileCopyrightText: Copyright © 2022 Idiap Research Institute <contact@idiap.ch>
+#
+# SPDX-License-Identifier: BSD-3-Clause
+
+import hashlib
+import importlib.metadata
+import io
+import json
+
+import pytest
+import requests
+
+import auto_intersphinx.catalog as catalog_module
+
+from auto_intersphinx.catalog import (
+    _MAX_WORKERS,
+    _POOL_SIZE,
+    _SESSION,
+    Catalog,
+    LookupCatalog,
+    _ensure_webdir,
+    _json_dumps,
+    _json_loads,
+    _looks_like_version,
+    _parse_version,
+    _prepare_versions,
+    _reorder_versions,
+    docurls_from_environment,
+    docurls_from_pypi,
+    docurls_from_rtd,
+    dumps,
+    environment_index,
+    fetch_lines,
+    max_lookup_workers,
+)
+
+_PYPI_FOO = {
+    "info": {
+        "version": "1.0.0",
+        "project_urls": {"Documentation": "https://foo.example.com/docs/"},
+    },
+    "releases": {"1.0.0": []},
+}
+"""PyPI information of a package with a documentation URL."""
+
+
+def _response(url: str, status: int = 200, text: str = "") -> requests.Response:
+    """Builds a canned HTTP response."""
+    r = requests.Response()
+    r.url = url
+    r.status_code = status
+    r.encoding = "utf-8"
+    r.raw = io.BytesIO(text.encode())
+    return r
+
+
+class _FakeSession:
+    """HTTP session answering with canned pages, that records requested URLs.
+
+    Pages may be set to their contents, to an HTTP status code, or to an
+    exception to raise.  Requests to any other URL are answered with a
+    404 (not found) status.
+    """
+
+    def __init__(self, pages: dict[str, str | int | Exception] = {}):
+        self.pages = pages
+        self.urls: list[str] = []
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        self.urls.append(url)
+        page = self.pages.get(url, 404)
+        if isinstance(page, Exception):
+            raise page
+        if isinstance(page, int):
+            return _response(url, status=page)
+        return _response(url, text=page)
+
+    head = get
+
+
+def test_session_does_not_raise_on_status():
+    # error responses are returned (after retries), so callers check ``.ok``
+    assert _SESSION.get_adapter("https://").max_retries.raise_on_status is False
+
+
+@pytest.mark.parametrize("max_entries", (-1, 0, 1, 3, 16, 100))
+def test_workers_fit_in_connection_pool(max_entries):
+    # each package lookup may probe releases on PyPI on its own thread pool
+    per_package = _MAX_WORKERS if max_entries < 0 else max(1, max_entries)
+    per_package = min(_MAX_WORKERS, per_package)
+    assert max_lookup_workers(max_entries) * per_package <= _POOL_SIZE
+
+
+def test_fetch_lines(monkeypatch):
+    url = "https://foo.example.com/requirements.txt"
+    session = _FakeSession({url: "foo\r\nbär\n"})
+    monkeypatch.setattr(catalog_module, "_SESSION", session)
+    assert list(fetch_lines(url)) == ["foo", "bär"]
+    assert session.urls == [url]
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(fetch_lines("https://foo.example.com/missing.txt"))
+
+
+def test_pypi_unreachable_documentation():
+    session = _FakeSession(
+        {
+            "https://pypi.org/pypi/foo/json": json.dumps(_PYPI_FOO),
+            "https://foo.example.com/docs/": requests.exceptions.ConnectTimeout(),
+        }
+    )
+    assert docurls_from_pypi("foo", 0, session) == {}
+
+
+def test_pypi_unavailable_inventory():
+    session = _FakeSession(
+        {
+            "https://pypi.org/pypi/foo/json": json.dumps(_PYPI_FOO),
+            "https://foo.example.com/docs/": "",
+            "https://foo.example.com/docs/objects.inv": 503,
+        }
+    )
+    assert docurls_from_pypi("foo", 0, session) == {}
+
+
+def test_lookups_use_given_session():
+    session = _FakeSession(
+        {
+            "https://pypi.org/pypi/foo/json": json.dumps(_PYPI_FOO),
+            "https://foo.example.com/docs/": "",
+            "https://foo.example.com/docs/objects.inv": "",
+        }
+    )
+    assert docurls_from_rtd("foo", session) == {}
+    assert docurls_from_pypi("foo", 0, session) == {
+        "1.0.0": "https://foo.example.com/docs/"
+    }
+    assert session.urls == [
+        "https://readthedocs.org/projects/foo/versions/",
+        "https://pypi.org/pypi/foo/json",
+        "https://foo.example.com/docs/",
+        "https://foo.example.com/docs/objects.inv",
+    ]
+
+
+def test_lookup_invalidate():
+    catalog = Catalog()
+    catalog.loads(
+        '{"foo": {"versions": {"latest": "https://foo.example.com/"}, '
+        '"sources": {"pypi": "foo-py"}}}'
+    )
+    lookup = LookupCatalog(catalog)
+    assert lookup.get("foo", "stable") == "https://foo.example.com"
+
+    # changes on the catalog are only visible after invalidation
+    catalog["foo"]["versions"]["1.0"] = "https://foo.example.com/1.0/"
+    assert lookup.get("foo", "1.0") is None
+    lookup.invalidate("foo")
+    assert lookup.get("foo", "1.0") == "https://foo.example.com/1.0"
+
+    # removed packages also lose their aliases
+    del catalog["foo"]
+    lookup.invalidate("foo")
+    assert lookup.get("foo-py", "latest") is None
+    assert lookup.get("foo", "stable") is None
+
+
+def test_environment_index():
+    index = environment_index()
+    assert index["sphinx"].version == importlib.metadata.version("sphinx")
+
+    # packages are only searched for on the index
+    assert docurls_from_environment("sphinx", env_index={}) == {}
+
+
+def test_same_versions_keep_catalog_clean(monkeypatch):
+    found = {
+        "latest": "https://foo.example.com/",
+        "1.0": "https://foo.example.com/1.0/",
+    }
+    monkeypatch.setattr(catalog_module, "docurls_from_rtd", lambda *_: found)
+
+    catalog = Catalog()
+    catalog.update_versions(["foo"], order=["readthedocs"])
+    catalog.loads(catalog.dumps())
+    assert "latest" in catalog["foo"]["versions"]
+
+    # looking up the same versions again does not change the catalog
+    catalog.update_versions(["foo"], order=["readthedocs"])
+    assert not catalog.dirty
+
+
+@pytest.mark.skipif(catalog_module.orjson is None, reason="requires orjson")
+def test_json_dumps_backends_match(monkeypatch, datadir):
+    data = _json_loads((datadir / "catalog.json").read_bytes())
+    data["ünïcødé"] = {"versions": {"latest": "https://例え.jp/"}, "sources": {}}
+    expected = _json_dumps(data, newline=True)
+
+    monkeypatch.setattr(catalog_module, "orjson", None)
+    assert _json_dumps(data, newline=True) == expected
+
+
+def test_lookup_canonical_names():
+    catalog = Catalog()
+    catalog.loads(
+        '{"Foo_Bar": {"versions": {"latest": "https://foo.example.com/"}, '
+        '"sources": {}}}'
+    )
+    lookup = LookupCatalog(catalog)
+    assert "foo-bar" in lookup
+    assert lookup.get_normalized("foo-bar", "stable") == "https://foo.example.com"
+    assert lookup.get("foo.bar", "latest") == "https://foo.example.com"
+    assert lookup.get_normalized("Foo_Bar", "latest") is None
+
+
+def test_content_hash_matches_dump(datadir, tmp_path):
+    catalog = Catalog()
+    catalog.load(datadir / "catalog.json")
+    catalog.dump(tmp_path / "catalog.json")
+
+    on_disk = hashlib.blake2b((tmp_path / "catalog.json").read_bytes())
+    assert catalog.content_hash() == on_disk.digest()
+
+
+def test_pypi_releases_in_decreasing_version_order():
+    def _release(version: str) -> str:
+        urls = {"Documentation": f"https://foo.example.com/{version}/"}
+        return json.dumps({"info": {"version": version, "project_urls": urls}})
+
+    releases = ("1.0.0", "1.1.0", "2.0.0", "2.0.0rc1")
+    pages: dict[str, str | int | Exception] = {
+        "https://pypi.org/pypi/foo/json": json.dumps(
+            {
+                "info": {"version": "2.0.0", "project_urls": {}},
+                "releases": {k: [] for k in releases},
+            }
+        )
+    }
+    for k in releases:
+        pages[f"https://pypi.org/pypi/foo/{k}/json"] = _release(k)
+        pages[f"https://foo.example.com/{k}/objects.inv"] = ""
+
+    versions = docurls_from_pypi("foo", 3, _FakeSession(pages))
+    assert list(versions.items()) == [
+        ("2.0.0", "https://foo.example.com/2.0.0/"),
+        ("2.0.0rc1", "https://foo.example.com/2.0.0rc1/"),
+        ("1.1.0", "https://foo.example.com/1.1.0/"),
+    ]
+
+
+def test_parse_version():
+    assert _parse_version("1.0") is _parse_version("1.0")
+    assert _parse_version("not-a-version") is None
+
+
+def test_parse_version_accepts_pep440_spellings():
+    # these were also accepted by the former regular expression
+    assert _parse_version(" v1.0 ") == _parse_version("1.0")
+    assert _parse_version("1.0-RC1") == _parse_version("1.0rc1")
+
+
+def test_reorder_versions():
+    versions = {k: f"https://foo.example.com/{k}" for k in ("1.0", "dev", "2.0")}
+    versions["stable"] = "https://foo.example.com/stable"
+    assert list(_reorder_versions(versions)) == ["stable", "2.0", "1.0", "dev"]
+
+
+def test_reorder_versions_with_equivalent_keys():
+    keys = ("v1.0", "1.0", "2.0", "latest", "dev", "stable")
+    versions = {k: f"https://foo.example.com/{k}" for k in keys}
+    assert list(_reorder_versions(versions)) == [
+        "latest",
+        "stable",
+        "2.0",
+        "1.0",
+        "v1.0",
+        "dev",
+    ]
+
+
+def test_update_versions_reorders_once(monkeypatch):
+    monkeypatch.setattr(
+        catalog_module, "docurls_from_rtd", lambda *_: {"1.0": "https://a.org/1.0/"}
+    )
+    monkeypatch.setattr(
+        catalog_module, "docurls_from_pypi", lambda *_: {"2.0": "https://a.org/2.0/"}
+    )
+    calls = []
+    reorder_versions = catalog_module._reorder_versions
+
+    def _reorder_versions(vdict):
+        calls.append(list(vdict))
+        return reorder_versions(vdict)
+
+    monkeypatch.setattr(catalog_module, "_reorder_versions", _reorder_versions)
+
+    catalog = Catalog()
+    catalog.update_versions(["foo"], order=["readthedocs", "pypi"], keep_going=True)
+    assert calls == [["1.0", "2.0"]]
+    assert list(catalog["foo"]["versions"]) == ["2.0", "1.0"]
+
+
+def test_update_versions_indexes_environment_once(monkeypatch):
+    calls = []
+
+    def _environment_index():
+        calls.append(None)
+        return {}
+
+    monkeypatch.setattr(catalog_module, "environment_index", _environment_index)
+
+    catalog = Catalog()
+    catalog.update_versions(["foo", "bar"], order=["environment"])
+    assert len(calls) == 1
+
+    calls.clear()
+    catalog.update_versions(
+        ["foo"], order=["readthedocs"], names={"readthedocs": {"foo": None}}
+    )
+    assert calls == []
+
+
+def test_membership_does_not_rewrite_urls():
+    catalog = Catalog()
+    catalog["foo"] = dict(versions={"1.0": "https://a.org/1.0/"}, sources={})
+
+    assert "foo" in catalog
+    assert "bar" not in catalog
+    assert catalog._data["foo"]["versions"]["1.0"] == "https://a.org/1.0/"
+    assert not hasattr(catalog, "__dict__")
+
+
+def test_max_age_is_per_catalog_file(monkeypatch, tmp_path):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    calls = []
+
+    def _docurls_from_pypi(package, *_):
+        calls.append(package)
+        return {"2.0.0": "https://foo.example.com/docs/"}
+
+    monkeypatch.setattr(catalog_module, "docurls_from_pypi", _docurls_from_pypi)
+    contents = '{"foo": {"versions": {}, "sources": {"pypi": "foo"}}}'
+    first = tmp_path / "first.json"
+    first.write_text(contents)
+    second = tmp_path / "second.json"
+    second.write_text(contents)
+
+    catalog = Catalog()
+    catalog.load(first)
+    catalog.self_update(max_age=3600)
+    assert "2.0.0" in catalog["foo"]["versions"]
+    assert len(calls) == 1
+
+    # updated recently: skipped
+    catalog.self_update(max_age=3600)
+    assert len(calls) == 1
+
+    # another catalog is not affected
+    other = Catalog()
+    other.load(second)
+    other.self_update(max_age=3600)
+    assert len(calls) == 2
+
+    # by default, everything is updated, and update times are not recorded
+    catalog.self_update()
+    assert len(calls) == 3
+    third = tmp_path / "third.json"
+    third.write_text(contents)
+    catalog.load(third)
+    catalog.self_update()
+    assert not catalog._checked_recently("foo", 3600)
+
+
+def test_update_versions_merges_in_listed_order(monkeypatch):
+    def _docurls_from_pypi(package, *_):
+        if package == "bar":
+            return {}
+        return {"1.0": f"https://{package}.example.com/1.0/"}
+
+    monkeypatch.setattr(catalog_module, "docurls_from_pypi", _docurls_from_pypi)
+
+    catalog = Catalog()
+    catalog["baz"] = dict(versions={"0.1": "https://baz.example.com/0.1"}, sources={})
+    catalog.update_versions(["foo", "bar", "baz", "qux"], order=["pypi"])
+    assert list(catalog) == ["baz", "foo", "bar", "qux"]
+    assert catalog["bar"]["versions"] == {}
+    assert list(catalog["baz"]["versions"]) == ["1.0", "0.1"]
+
+    with pytest.raises(RuntimeError):
+        catalog.update_versions(["foo"], order=["unknown"])
+
+
+def test_ensure_defaults():
+    catalog = Catalog()
+    catalog._ensure_defaults("foo")
+    assert catalog["foo"] == {"versions": {}, "sources": {}}
+    assert catalog.dirty
+
+    catalog = Catalog()
+    catalog.loads('{"foo": {"versions": {"1.0": "https://a.org/1.0/"}}}')
+    catalog._ensure_defaults("foo")
+    assert catalog._data["foo"] == {
+        "versions": {"1.0": "https://a.org/1.0/"},
+        "sources": {},
+    }
+
+
+def test_pypi_shared_documentation_is_checked_once():
+    releases = ("1.0.0", "1.1.0", "2.0.0")
+    pages: dict[str, str | int | Exception] = {
+        "https://pypi.org/pypi/foo/json": json.dumps(
+            {
+                "info": {"version": "2.0.0", "project_urls": {}},
+                "releases": {k: [] for k in releases},
+            }
+        ),
+        "https://foo.example.com/docs/objects.inv": "",
+    }
+    for k in releases:
+        pages[f"https://pypi.org/pypi/foo/{k}/json"] = json.dumps(
+            {"info": {"version": k, "project_urls": _PYPI_FOO["info"]["project_urls"]}}
+        )
+
+    session = _FakeSession(pages)
+    versions = docurls_from_pypi("foo", -1, session)
+    assert list(versions) == ["2.0.0", "1.1.0", "1.0.0"]
+    assert session.urls.count("https://foo.example.com/docs/objects.inv") == 1
+
+
+def test_pypi_missing_inventory_is_checked_once():
+    releases = ("1.0.0", "2.0.0")
+    urls = _PYPI_FOO["info"]["project_urls"]
+    pages: dict[str, str | int | Exception] = {
+        "https://pypi.org/pypi/foo/json": json.dumps(
+            {
+                "info": {"version": "2.0.0", "project_urls": urls},
+                "releases": {k: [] for k in releases},
+            }
+        ),
+        "https://foo.example.com/docs/": "",
+    }
+    for k in releases:
+        pages[f"https://pypi.org/pypi/foo/{k}/json"] = json.dumps(
+            {"info": {"version": k, "project_urls": urls}}
+        )
+
+    session = _FakeSession(pages)
+    assert docurls_from_pypi("foo", -1, session) == {}
+    assert session.urls.count("https://foo.example.com/docs/objects.inv") == 1
+
+
+def test_ensure_webdir():
+    assert _ensure_webdir("https://a.org/doc") == "https://a.org/doc/"
+    assert _ensure_webdir("https://a.org/doc/index.html") == "https://a.org/doc/"
+    assert _ensure_webdir("https://a.org/doc/?x=1#top") == "https://a.org/doc/"
+
+
+def test_rtd_versions():
+    page = (
+        '<html><body><div id="versions">'
+        '<a class="module-item-title" href="https://foo.rtfd.io/en/latest/">'
+        "latest</a>"
+        '<a class="module-item-title" href="/en/1.0/">1.0</a>'
+        "</div></body></html>"
+    )
+    session = _FakeSession({"https://readthedocs.org/projects/foo/versions/": page})
+    assert docurls_from_rtd("foo", session) == {
+        "latest": "https://foo.rtfd.io/en/latest/"
+    }
+
+
+def test_rtd_versions_are_fetched_once():
+    url = "https://readthedocs.org/projects/foo/versions/"
+    session = _FakeSession({url: "<html><body></body></html>"})
+    assert docurls_from_rtd("foo", session) == {}
+    assert session.urls == [url]
+
+
+def test_looks_like_version():
+    # anything accepted by packaging is also accepted by the pre-filter
+    for k in ("1.0", " v1.0", "V2", "1!2.0", "2.0.post1"):
+        assert _parse_version(k) is not None
+        assert _looks_like_version(k)
+    assert not _looks_like_version("latest")
+
+
+def test_dump_ends_with_single_newline(tmp_path):
+    catalog = Catalog()
+    catalog.loads('{"foo": {"versions": {}, "sources": {}}}')
+    catalog.dump(tmp_path / "catalog.json")
+    assert (tmp_path / "catalog.json").read_bytes().endswith(b"}\n}\n")
+
+
+def test_dumps():
+    versions = {"1.0": "https://foo.example.com/é/"}
+    assert dumps(versions) == '{\n  "1.0": "https://foo.example.com/é/"\n}'
+
+    catalog = Catalog()
+    catalog["foo"] = dict(versions=versions, sources={})
+    assert catalog.dumps() == dumps(catalog._data)
+
+
+def test_lookup_versions_are_prepared_on_first_access(monkeypatch, datadir):
+    prepared = []
+    prepare_versions = catalog_module._prepare_versions
+
+    def _prepare_versions(versions):
+        prepared.append(versions)
+        return prepare_versions(versions)
+
+    monkeypatch.setattr(catalog_module, "_prepare_versions", _prepare_versions)
+
+    catalog = Catalog()
+    catalog.load(datadir / "catalog.json")
+    lookup = LookupCatalog(catalog)
+    assert len(catalog) > 1
+    assert not prepared
+
+    pkg = next(iter(catalog))
+    lookup.get(pkg, "stable")
+    lookup.get(pkg, "latest")
+    assert prepared == [catalog[pkg]["versions"]]
+
+
+def test_prepare_versions():
+    versions = {k: f"https://a.org/{k}" for k in ("2.1.x", "2.0", "3.0rc1", "main")}
+    assert _prepare_versions(versions) == {
+        "latest": "https://a.org/3.0rc1",
+        "stable": "https://a.org/2.1.x",
+        "3.0rc1": "https://a.org/3.0rc1",
+        "2.1.x": "https://a.org/2.1.x",
+        "2.1": "https://a.org/2.1.x",
+        "2.0": "https://a.org/2.0",
+    }
+
+    # without version numbers, aliases are used
+    assert _prepare_versions({"main": "https://a.org/main"}) == {
+        "latest": "https://a.org/main",
+        "stable": "https://a.org/main",
+    }
@@ -2,27 +2,32 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import time
+
 import pytest
 
-from auto_intersphinx.cli import main
+from auto_intersphinx.cli import main, make_parser
+
+pytestmark = pytest.mark.usefixtures("mock_http")
 
 
 @pytest.mark.parametrize("option", ("-h", "--help"))
 def test_help(capsys, option):
-    try:
+    with pytest.raises(SystemExit) as e:
         main(["check-packages"] + [option])
-    except SystemExit:
-        pass
+    assert e.value.code == 0
 
     output = capsys.readouterr().out
     assert "Discover documentation cross-references for packages" in output
 
 
+def test_pypi_max_entries_is_integer():
+    args = make_parser().parse_args(["check-packages", "-M", "3", "requests"])
+    assert args.pypi_max_entries == 3
+
+
 def test_keep_going(capsys):
-    try:
-        main(["check-packages", "-vvv", "--keep-going", "requests"])
-    except SystemExit:
-        pass
+    main(["check-packages", "-vvv", "--keep-going", "requests"])
 
     output = capsys.readouterr().out
     assert "Found requests in builtin catalog" in output
@@ -31,21 +36,56 @@ def test_keep_going(capsys):
     assert "Found requests documentation in PyPI" in output
 
 
+def test_results_in_listed_order(capsys, monkeypatch):
+    def _docurls_from_rtd(p):
+        # the first package listed is the last one found
+        time.sleep(0.1 if p == "foo" else 0)
+        return {"1.0": f"https://{p}.example.com/1.0/"}
+
+    monkeypatch.setattr("auto_intersphinx.catalog.docurls_from_rtd", _docurls_from_rtd)
+    main(["check-packages", "-S", "-E", "-P", "foo", "bar"])
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[0] == "Looking up foo, bar online - this may be long..."
+    found = [k for k in output if k.startswith("Found")]
+    assert found == [
+        "Found foo documentation in readthedocs.org:",
+        "Found bar documentation in readthedocs.org:",
+    ]
+
+
+def test_repeated_packages_are_reported_once(capsys, monkeypatch):
+    probed = []
+
+    def _docurls_from_rtd(p):
+        probed.append(p)
+        return {"1.0": f"https://{p}.example.com/1.0/"}
+
+    monkeypatch.setattr("auto_intersphinx.catalog.docurls_from_rtd", _docurls_from_rtd)
+    main(["check-packages", "-S", "-E", "-P", "foo", "bar", "foo"])
+
+    output = capsys.readouterr().out.splitlines()
+    assert output[0] == "Looking up foo, bar online - this may be long..."
+    found = [k for k in output if k.startswith("Found")]
+    assert found == [
+        "Found foo documentation in readthedocs.org:",
+        "Found bar documentation in readthedocs.org:",
+    ]
+    assert sorted(probed) == ["bar", "foo"]
+
+
 def test_user_catalog(capsys, datadir):
     user_catalog = datadir / "catalog.json"
 
-    try:
-        main(
-            [
-                "check-packages",
-                "-vvv",
-                f"--user={str(user_catalog)}",
-                "--keep-going",
-                "click",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "check-packages",
+            "-vvv",
+            f"--user={user_catalog}",
+            "--keep-going",
+            "click",
+        ]
+    )
 
     output = capsys.readouterr().out
     assert "Found click in user catalog" in output
@@ -57,10 +97,7 @@ def test_user_catalog(capsys, datadir):
 def test_stop_at_user_catalog(capsys, datadir):
     user_catalog = datadir / "catalog.json"
 
-    try:
-        main(["check-packages", "-vvv", f"--user={str(user_catalog)}", "click"])
-    except SystemExit:
-        pass
+    main(["check-packages", "-vvv", f"--user={user_catalog}", "click"])
 
     output = capsys.readouterr().out
     assert "Found click in user catalog" in output
@@ -70,11 +107,19 @@ def test_stop_at_user_catalog(capsys, datadir):
     assert "Found click documentation in PyPI" not in output
 
 
+def test_environment_not_indexed_if_unused(capsys, monkeypatch):
+    def _unexpected():
+        pytest.fail("environment was indexed")
+
+    monkeypatch.setattr("auto_intersphinx.catalog.environment_index", _unexpected)
+    main(["check-packages", "requests"])
+
+    output = capsys.readouterr().out
+    assert "Found requests in builtin catalog" in output
+
+
 def test_stop_at_builtin_catalog(capsys):
-    try:
-        main(["check-packages", "-vvv", "requests"])
-    except SystemExit:
-        pass
+    main(["check-packages", "-vvv", "requests"])
 
     output = capsys.readouterr().out
     assert "Found requests in user catalog" not in output
@@ -85,10 +130,7 @@ def test_stop_at_builtin_catalog(capsys):
 
 
 def test_stop_at_environment(capsys):
-    try:
-        main(["check-packages", "-vvv", "--no-builtin", "requests"])
-    except SystemExit:
-        pass
+    main(["check-packages", "-vvv", "--no-builtin", "requests"])
 
     output = capsys.readouterr().out
     assert "Found requests in user catalog" not in output
@@ -99,18 +141,15 @@ def test_stop_at_environment(capsys):
 
 
 def test_stop_at_readthedocs(capsys):
-    try:
-        main(
-            [
-                "check-packages",
-                "-vvv",
-                "--no-builtin",
-                "--no-environment",
-                "requests",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "check-packages",
+            "-vvv",
+            "--no-builtin",
+            "--no-environment",
+            "requests",
+        ]
+    )
 
     output = capsys.readouterr().out
     assert "Found requests in user catalog" not in output
@@ -121,19 +160,16 @@ def test_stop_at_readthedocs(capsys):
 
 
 def test_stop_at_pypi(capsys):
-    try:
-        main(
-            [
-                "check-packages",
-                "-vvv",
-                "--no-builtin",
-                "--no-environment",
-                "--no-rtd",
-                "requests",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "check-packages",
+            "-vvv",
+            "--no-builtin",
+            "--no-environment",
+            "--no-rtd",
+            "requests",
+        ]
+    )
 
     output = capsys.readouterr().out
     assert "Found requests in user catalog" not in output
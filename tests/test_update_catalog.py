@@ -2,64 +2,59 @@
 #
 # SPDX-License-Identifier: BSD-3-Clause
 
+import filecmp
+
 import pytest
 
 from auto_intersphinx.catalog import BUILTIN_CATALOG
 from auto_intersphinx.cli import main
+from auto_intersphinx.update_catalog import (
+    _iter_requirements,
+    _parse_requirements,
+    setup_verbosity,
+)
+
+pytestmark = pytest.mark.usefixtures("mock_http")
 
 
 @pytest.mark.parametrize("option", ("-h", "--help"))
 def test_help(capsys, option):
-    try:
+    with pytest.raises(SystemExit) as e:
         main(["update-catalog"] + [option])
-    except SystemExit:
-        pass
+    assert e.value.code == 0
 
     output = capsys.readouterr().out
     assert "Updates catalog of intersphinx cross-references" in output
 
 
-def test_dump(capsys, tmp_path):
-    output_catalog = tmp_path / "catalog.json"
+def test_setup_verbosity_installs_one_handler(capsys, package_logger):
+    setup_verbosity(0)
+    setup_verbosity(3)
+    package_logger.info("message")
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    assert capsys.readouterr().out == "[INFO] message\n"
 
-    assert output_catalog.exists()
-    assert BUILTIN_CATALOG.read_text() == output_catalog.read_text()
+    # the handler is re-attached, if removed in between
+    package_logger.handlers.clear()
+    setup_verbosity(3)
+    package_logger.info("message")
 
-    output = capsys.readouterr().out
-    assert "click" not in output
-    assert "https://pypi.org/pypi/numpy/json" not in output
-    assert "https://readthedocs.org/projects/packaging/versions/" not in output
+    assert capsys.readouterr().out == "[INFO] message\n"
 
 
-def test_dump2(capsys, datadir, tmp_path):
-    input_catalog = datadir / "catalog.json"
+def test_dump(capsys, tmp_path):
     output_catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                f"--catalog={str(input_catalog)}",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            f"--output={output_catalog}",
+        ]
+    )
 
     assert output_catalog.exists()
-    assert input_catalog.read_text() == output_catalog.read_text()
+    assert BUILTIN_CATALOG.read_bytes() == output_catalog.read_bytes()
 
     output = capsys.readouterr().out
     assert "click" not in output
@@ -67,69 +62,44 @@ def test_dump2(capsys, datadir, tmp_path):
     assert "https://readthedocs.org/projects/packaging/versions/" not in output
 
 
-def test_verbose_0(capsys, datadir, tmp_path):
+def test_dump2(capsys, datadir, tmp_path):
     input_catalog = datadir / "catalog.json"
     output_catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                f"--catalog={str(input_catalog)}",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            f"--catalog={input_catalog}",
+            f"--output={output_catalog}",
+        ]
+    )
 
     assert output_catalog.exists()
-    assert input_catalog.read_text() == output_catalog.read_text()
+    assert filecmp.cmp(input_catalog, output_catalog, shallow=False)
 
     output = capsys.readouterr().out
-    assert output == ""
+    assert "click" not in output
+    assert "https://pypi.org/pypi/numpy/json" not in output
+    assert "https://readthedocs.org/projects/packaging/versions/" not in output
 
 
-def test_verbose_1(capsys, datadir, tmp_path):
+@pytest.mark.parametrize("flags", ([], ["-v"], ["-vv"]))
+def test_verbose(capsys, datadir, tmp_path, flags):
     input_catalog = datadir / "catalog.json"
     output_catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-v",
-                f"--catalog={str(input_catalog)}",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            *flags,
+            f"--catalog={input_catalog}",
+            f"--output={output_catalog}",
+        ]
+    )
 
     assert output_catalog.exists()
-    assert input_catalog.read_text() == output_catalog.read_text()
-
-    output = capsys.readouterr().out
-    assert output == ""
-
-
-def test_verbose_2(capsys, datadir, tmp_path):
-    input_catalog = datadir / "catalog.json"
-    output_catalog = tmp_path / "catalog.json"
-
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vv",
-                f"--catalog={str(input_catalog)}",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
-
-    assert output_catalog.exists()
-    assert input_catalog.read_text() == output_catalog.read_text()
+    assert filecmp.cmp(input_catalog, output_catalog, shallow=False)
 
     output = capsys.readouterr().out
     assert output == ""
@@ -139,18 +109,15 @@ def test_self_update(capsys, datadir, tmp_path):
     input_catalog = datadir / "catalog.json"
     output_catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                "--self",
-                f"--catalog={str(input_catalog)}",
-                f"--output={str(output_catalog)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            "--self",
+            f"--catalog={input_catalog}",
+            f"--output={output_catalog}",
+        ]
+    )
 
     assert output_catalog.exists()
 
@@ -163,22 +130,19 @@ def test_self_update(capsys, datadir, tmp_path):
 def test_boostrap_from_package_list(capsys, tmp_path):
     catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                "--keep-going",
-                "--pypi-max-entries=2",
-                f"--catalog={str(catalog)}",
-                f"--output={str(catalog)}",
-                "numpy",
-                "requests",
-                "click",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            "--keep-going",
+            "--pypi-max-entries=2",
+            f"--catalog={catalog}",
+            f"--output={catalog}",
+            "numpy",
+            "requests",
+            "click",
+        ]
+    )
 
     assert catalog.exists()
 
@@ -193,24 +157,41 @@ def test_boostrap_from_package_list(capsys, tmp_path):
     assert "Saving package catalog with 3 entries at" in output
 
 
+def test_repeated_packages_are_updated_once(datadir, monkeypatch, tmp_path):
+    updated = []
+    monkeypatch.setattr(
+        "auto_intersphinx.catalog.Catalog.update_versions",
+        lambda self, pkgs, **_: updated.extend(pkgs),
+    )
+    catalog = tmp_path / "catalog.json"
+    main(
+        [
+            "update-catalog",
+            f"--catalog={catalog}",
+            f"--output={catalog}",
+            "click",
+            str(datadir / "requirements.txt"),
+            "numpy",
+        ]
+    )
+    assert updated == ["click", "numpy", "requests"]
+
+
 def test_boostrap_from_package_list_to_stdout(capsys, tmp_path):
     catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                "--keep-going",
-                "--pypi-max-entries=2",
-                f"--catalog={str(catalog)}",
-                "numpy",
-                "requests",
-                "click",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            "--keep-going",
+            "--pypi-max-entries=2",
+            f"--catalog={catalog}",
+            "numpy",
+            "requests",
+            "click",
+        ]
+    )
 
     assert not catalog.exists()
 
@@ -227,24 +208,35 @@ def test_boostrap_from_package_list_to_stdout(capsys, tmp_path):
     assert '"readthedocs": "requests"' in output
 
 
+def test_parse_requirements(datadir):
+    requirements = datadir / "requirements.txt"
+    assert _parse_requirements(requirements.read_text()) == [
+        "numpy",
+        "click",
+        "requests",
+    ]
+
+
+def test_iter_requirements(datadir):
+    with (datadir / "requirements.txt").open() as f:
+        assert list(_iter_requirements(f)) == ["numpy", "click", "requests"]
+
+
 def test_boostrap_from_file(capsys, datadir, tmp_path):
     requirements = datadir / "requirements.txt"
     catalog = tmp_path / "catalog.json"
 
-    try:
-        main(
-            [
-                "update-catalog",
-                "-vvv",
-                "--keep-going",
-                "--pypi-max-entries=0",
-                f"--catalog={str(catalog)}",
-                f"--output={str(catalog)}",
-                f"{str(requirements)}",
-            ]
-        )
-    except SystemExit:
-        pass
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            "--keep-going",
+            "--pypi-max-entries=0",
+            f"--catalog={catalog}",
+            f"--output={catalog}",
+            str(requirements),
+        ]
+    )
 
     assert catalog.exists()
 
@@ -256,28 +248,53 @@ def test_boostrap_from_file(capsys, datadir, tmp_path):
     assert "https://pypi.org/pypi/click/json" in output
     assert "https://pypi.org/pypi/numpy/json" in output
     assert "https://pypi.org/pypi/requests/json" in output
-    assert "Saving package catalog with 13 entries at" in output
+    assert "Saving package catalog with 3 entries at" in output
 
 
-def test_remote_list_does_not_exist(capsys, tmp_path):
+def test_remote_list_does_not_exist(capsys, tmp_path, mock_http):
     address = "https://example.com/does/not/exist/requirements.txt"
     catalog = tmp_path / "catalog.json"
 
-    try:
+    if mock_http is not None:
+        mock_http.get(address, status=404)
+
+    with pytest.raises(SystemExit) as e:
         main(
             [
                 "update-catalog",
                 "--keep-going",
                 "--pypi-max-entries=0",
-                f"--catalog={str(catalog)}",
-                f"--output={str(catalog)}",
+                f"--catalog={catalog}",
+                f"--output={catalog}",
                 address,
             ]
         )
-    except SystemExit:
-        pass
+    assert e.value.code == 1
 
     assert not catalog.exists()
 
     output = capsys.readouterr().out
     assert f"[ERROR] Could not retrieve `{address}'" == output.strip()
+
+
+def test_boostrap_from_remote_list(capsys, datadir, tmp_path, canned_http):
+    address = "https://example.com/requirements.txt"
+    canned_http.get(address, body=(datadir / "requirements.txt").read_bytes())
+    catalog = tmp_path / "catalog.json"
+
+    main(
+        [
+            "update-catalog",
+            "-vvv",
+            "--pypi-max-entries=0",
+            f"--catalog={catalog}",
+            f"--output={catalog}",
+            address,
+        ]
+    )
+
+    assert catalog.exists()
+
+    output = capsys.readouterr().out
+    assert f"Retrieving package list from `{address}'" in output
+    assert "Saving package catalog with 3 entries at" in output